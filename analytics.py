@@ -0,0 +1,239 @@
+"""Attendance analytics computed over whole columns of course data.
+
+Courses are first copied into a :class:`CourseColumns` view: names, a
+format code per course as ``array('I')`` and un_classes as ``array('B')``.
+Every statistic is then a vectorised pass over those arrays with NumPy,
+or with C-level builtins when NumPy is not installed.
+
+Run ``python analytics.py`` for a report on the stored courses.
+"""
+
+import sys
+from array import array
+from collections import Counter
+from operator import attrgetter
+from typing import Dict, Iterable, List, Tuple
+
+from course import ATTENDANCE_TAGS, FORMATS, Course
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised without NumPy installed
+    np = None
+
+MAX_UN_CLASSES = len(ATTENDANCE_TAGS) - 1
+# Courses with at least this many unattended classes are at risk.
+AT_RISK_THRESHOLD = 2
+
+
+class CourseColumns:
+    """A columnar snapshot of courses.
+
+    ``format_codes[i]`` indexes ``formats``; the known formats come first,
+    any others are appended in order of appearance. Formats are free text
+    from imports, so the codes are not limited to a byte.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        formats: List[str],
+        format_codes: array,
+        un_classes: array,
+    ) -> None:
+        self.names = names
+        self.formats = formats
+        self.format_codes = format_codes
+        self.un_classes = un_classes
+
+    def __len__(self) -> int:
+        return len(self.un_classes)
+
+    @classmethod
+    def from_courses(cls, courses: Iterable[Course]) -> "CourseColumns":
+        """Copy ``courses`` into columns."""
+
+        courses = list(courses)
+        names = list(map(attrgetter("name"), courses))
+        un_classes = array("B", map(attrgetter("un_classes"), courses))
+        formats, format_codes = _encode_formats(map(attrgetter("format"), courses))
+        return cls(names, formats, format_codes, un_classes)
+
+    @classmethod
+    def from_store(cls, store) -> "CourseColumns":
+        """Build columns from a :class:`course_store.CourseStore`.
+
+        The store's un_classes array is shared, not copied.
+        """
+
+        formats, format_codes = _encode_formats(store.formats)
+        return cls(store.names, formats, format_codes, store.un_classes)
+
+
+def _encode_formats(formats: Iterable[str]) -> Tuple[List[str], array]:
+    """Map each format to a small integer code, known formats first."""
+
+    codes = {format: code for code, format in enumerate(FORMATS)}
+    formats = list(formats)
+    try:
+        format_codes = array("I", map(codes.__getitem__, formats))
+    except KeyError:
+        for format in formats:
+            codes.setdefault(format, len(codes))
+        format_codes = array("I", map(codes.__getitem__, formats))
+    return list(codes), format_codes
+
+
+def histogram(columns: CourseColumns) -> List[int]:
+    """Number of courses with 0, 1, 2 and 3 unattended classes."""
+
+    if np is not None:
+        counts = np.bincount(
+            np.frombuffer(columns.un_classes, dtype=np.uint8),
+            minlength=MAX_UN_CLASSES + 1,
+        )
+        return counts.tolist()
+    data = columns.un_classes.tobytes()
+    return [data.count(value) for value in range(MAX_UN_CLASSES + 1)]
+
+
+def tag_counts(columns: CourseColumns) -> Dict[str, int]:
+    """Number of courses shown with each attendance colour."""
+
+    return dict(zip(ATTENDANCE_TAGS, histogram(columns)))
+
+
+def format_histograms(columns: CourseColumns) -> Dict[str, List[int]]:
+    """Histogram of unattended classes per course format."""
+
+    width = MAX_UN_CLASSES + 1
+    if np is not None:
+        codes = np.frombuffer(columns.format_codes, dtype=np.uintc).astype(np.intp)
+        un_classes = np.frombuffer(columns.un_classes, dtype=np.uint8)
+        cells = np.bincount(
+            codes * width + un_classes, minlength=len(columns.formats) * width
+        ).reshape(len(columns.formats), width)
+        return dict(zip(columns.formats, cells.tolist()))
+    counts = Counter(zip(columns.format_codes, columns.un_classes))
+    return {
+        format: [counts[code, value] for value in range(width)]
+        for code, format in enumerate(columns.formats)
+    }
+
+
+def format_totals(columns: CourseColumns) -> Dict[str, Dict[str, int]]:
+    """Courses and total unattended classes per course format."""
+
+    return {
+        format: {
+            "courses": sum(counts),
+            "unattended": sum(value * count for value, count in enumerate(counts)),
+        }
+        for format, counts in format_histograms(columns).items()
+    }
+
+
+def at_risk(
+    columns: CourseColumns, threshold: int = AT_RISK_THRESHOLD
+) -> List[Tuple[str, str, int]]:
+    """Courses with at least ``threshold`` unattended classes."""
+
+    names, formats = columns.names, columns.formats
+    if np is not None:
+        un_classes = np.frombuffer(columns.un_classes, dtype=np.uint8)
+        positions = np.flatnonzero(un_classes >= threshold)
+        codes = np.frombuffer(columns.format_codes, dtype=np.uintc)[positions]
+        return list(
+            zip(
+                map(names.__getitem__, positions.tolist()),
+                np.array(formats, dtype=object)[codes].tolist(),
+                un_classes[positions].tolist(),
+            )
+        )
+    codes, un_classes = columns.format_codes, columns.un_classes
+    return [
+        (names[position], formats[codes[position]], value)
+        for position, value in enumerate(un_classes)
+        if value >= threshold
+    ]
+
+
+def summarize(columns: CourseColumns, threshold: int = AT_RISK_THRESHOLD) -> dict:
+    """All statistics above in one JSON-serialisable dict."""
+
+    counts = histogram(columns)
+    return {
+        "courses": len(columns),
+        "histogram": counts,
+        "tags": dict(zip(ATTENDANCE_TAGS, counts)),
+        "formats": {
+            format: {
+                "histogram": cells,
+                "courses": sum(cells),
+                "unattended": sum(value * count for value, count in enumerate(cells)),
+            }
+            for format, cells in format_histograms(columns).items()
+        },
+        "at_risk_threshold": threshold,
+        "at_risk": at_risk(columns, threshold),
+    }
+
+
+def format_report(summary: dict, limit: int = 20) -> str:
+    """Render :func:`summarize` output as a plain-text report."""
+
+    lines = [f"Kursy: {summary['courses']}"]
+    lines.append(
+        "Nieobecności: "
+        + ", ".join(
+            f"{value}: {count} ({tag})"
+            for value, (tag, count) in enumerate(summary["tags"].items())
+        )
+    )
+    lines.append("Formaty:")
+    for format, stats in summary["formats"].items():
+        if stats["courses"]:
+            lines.append(
+                f"  {format}: {stats['courses']} kursów, "
+                f"{stats['unattended']} nieobecności, histogram {stats['histogram']}"
+            )
+    at_risk_courses = summary["at_risk"]
+    lines.append(
+        f"Zagrożone (>= {summary['at_risk_threshold']}): {len(at_risk_courses)}"
+    )
+    for name, format, un_classes in at_risk_courses[:limit]:
+        lines.append(f"  {name}, {format}: {un_classes}")
+    if len(at_risk_courses) > limit:
+        lines.append(f"  ... i {len(at_risk_courses) - limit} więcej")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    import argparse
+    import json
+
+    from course_tracker import CourseTracker
+    from storage import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Attendance report for all courses.")
+    parser.add_argument("--db-directory", help="directory holding the database")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="tinydb")
+    parser.add_argument("--threshold", type=int, default=AT_RISK_THRESHOLD)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+
+    tracker = CourseTracker(db_directory=args.db_directory, backend=args.backend)
+    try:
+        summary = tracker.attendance_summary(args.threshold)
+    finally:
+        tracker.close()
+    if args.json:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(format_report(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Compare the vectorised attendance statistics with a naive loop.
+
+The naive version walks the ``Course`` objects once per statistic, the way
+the GUI colours rows. The vectorised version extracts columns once and
+computes every statistic from them. Run with::
+
+    python benchmarks/bench_analytics.py [courses]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import analytics
+from analytics import CourseColumns, summarize
+from course import ATTENDANCE_TAGS
+from course_store import CourseStore
+from synthetic import make_courses
+
+SIZE = 1_000_000
+
+
+def naive_summary(courses, threshold: int = 2) -> dict:
+    tags = {tag: 0 for tag in ATTENDANCE_TAGS}
+    for course in courses:
+        tags[ATTENDANCE_TAGS[min(course.un_classes, 3)]] += 1
+    formats = {}
+    for course in courses:
+        stats = formats.setdefault(course.format, {"courses": 0, "unattended": 0})
+        stats["courses"] += 1
+        stats["unattended"] += course.un_classes
+    at_risk = [
+        (course.name, course.format, course.un_classes)
+        for course in courses
+        if course.un_classes >= threshold
+    ]
+    return {"tags": tags, "formats": formats, "at_risk": at_risk}
+
+
+def timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:>10.1f} ms")
+    return elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    courses = make_courses(size)
+    store = CourseStore(courses)
+    print(f"{size} courses, numpy: {analytics.np is not None}")
+
+    naive = timed("naive loop over Course objects", lambda: naive_summary(courses))
+    columns = CourseColumns.from_courses(courses)
+    timed("column extraction from Course", lambda: CourseColumns.from_courses(courses))
+    timed("column extraction from CourseStore", lambda: CourseColumns.from_store(store))
+    vectorised = timed("vectorised statistics", lambda: summarize(columns))
+    total = timed(
+        "extraction + statistics",
+        lambda: summarize(CourseColumns.from_courses(courses)),
+    )
+    print(f"speedup: {naive / vectorised:.1f}x statistics, {naive / total:.1f}x total")
+
+
+if __name__ == "__main__":
+    main()
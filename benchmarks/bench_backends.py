@@ -0,0 +1,67 @@
+"""Compare storage backends: load time, mutation latency and import speed.
+
+Run with::
+
+    python benchmarks/bench_backends.py [sizes...]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from storage import BACKENDS
+from synthetic import course_key, course_rows, write_csv
+
+SIZES = (1_000, 10_000, 100_000)
+MUTATIONS = 50
+
+
+def run(backend: str, size: int, csv_file: Path) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory, backend=backend)
+        start = time.perf_counter()
+        report = tracker.import_courses_replace(str(csv_file))
+        import_seconds = time.perf_counter() - start
+        assert report.imported == size
+        tracker.close()
+
+        start = time.perf_counter()
+        tracker = CourseTracker(db_directory=directory, backend=backend)
+        load_seconds = time.perf_counter() - start
+
+        latencies = []
+        for i in range(MUTATIONS):
+            start = time.perf_counter()
+            tracker.increment_unattended(*course_key(i))
+            latencies.append(time.perf_counter() - start)
+        tracker.close()
+
+    return {
+        "load ms": load_seconds * 1000,
+        "mutation ms": statistics.median(latencies) * 1000,
+        "import rows/s": size / import_seconds,
+    }
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    columns = ("load ms", "mutation ms", "import rows/s")
+    print(f"{'courses':>8} {'backend':>8} " + " ".join(f"{c:>14}" for c in columns))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            csv_file = Path(directory) / f"courses-{size}.csv"
+            write_csv(csv_file, course_rows(size))
+            for backend in BACKENDS:
+                result = run(backend, size, csv_file)
+                print(
+                    f"{size:>8} {backend:>8} "
+                    + " ".join(f"{result[c]:>14,.2f}" for c in columns)
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure parallel multi-file import against importing files one by one.
+
+Generates ``files`` CSV files of ``rows`` rows each, all covering the same
+catalogue as attendance exports of different groups would. Each file is
+then imported with ``import_courses_append`` in turn, and the whole set
+with ``import_courses_bulk(conflict="sum")`` for 1, 2, 4, ... workers up
+to the number of CPUs. Run with::
+
+    python benchmarks/bench_bulk_import.py [files] [rows]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import course_key, write_csv
+
+
+def write_files(directory: Path, files: int, rows: int) -> list:
+    paths = []
+    for number in range(files):
+        rng = random.Random(number)
+        path = directory / f"group{number:03d}.csv"
+        write_csv(path, ((*course_key(i), rng.randrange(2)) for i in range(rows)))
+        paths.append(str(path))
+    return paths
+
+
+def timed_import(paths: list, workers: int | None) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory)
+        start = time.perf_counter()
+        if workers is None:
+            for path in paths:
+                tracker.import_courses_append(path)
+        else:
+            tracker.import_courses_bulk(paths, conflict="sum", workers=workers)
+        elapsed = time.perf_counter() - start
+        tracker.close()
+    return elapsed
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(Path(directory), files, rows)
+        print(f"{files} files x {rows} rows, {cpus} CPUs")
+
+        sequential = timed_import(paths, None)
+        print(f"{'one by one':>12}: {sequential:8.2f} s")
+        workers = 1
+        while True:
+            elapsed = timed_import(paths, workers)
+            print(
+                f"{workers:>4} worker{'s' if workers > 1 else ' '}: {elapsed:8.2f} s "
+                f"({files * rows / elapsed:,.0f} rows/s, "
+                f"{sequential / elapsed:.1f}x one by one)"
+            )
+            if workers >= cpus:
+                break
+            workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    main()
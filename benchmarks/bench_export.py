@@ -0,0 +1,64 @@
+"""Measure peak memory and time of exporting courses.
+
+Compares the streaming exporter with the previous implementation, which
+built every row in a list before writing. Run with::
+
+    python benchmarks/bench_export.py [sizes...]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import make_courses
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def legacy_export(tracker: CourseTracker, filename: str) -> None:
+    fields = ["Nazwa", "Format", "Opuszczone"]
+    rows = [
+        [course.name, course.format, str(course.un_classes)]
+        for course in tracker.courses
+    ]
+    with open(filename, "w", newline="") as csvfile:
+        csv.writer(csvfile).writerows([fields] + rows)
+
+
+def measure(export, filename: str) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    export(filename)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'courses':>9} {'exporter':>14} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory)
+        for size in sizes:
+            tracker.courses = make_courses(size)
+            exporters = (
+                ("legacy csv", lambda f: legacy_export(tracker, f), "out.csv"),
+                ("stream csv", tracker.export_courses, "out.csv"),
+                ("stream jsonl", tracker.export_courses, "out.jsonl"),
+                ("stream csv.gz", tracker.export_courses, "out.csv.gz"),
+            )
+            for label, export, name in exporters:
+                filename = os.path.join(directory, name)
+                elapsed, peak = measure(export, filename)
+                print(f"{size:>9} {label:>14} {elapsed:>8.2f} {peak / 2**20:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
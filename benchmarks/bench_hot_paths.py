@@ -0,0 +1,138 @@
+"""pytest-benchmark suite for the tracker's hot paths at 1k, 10k and 100k courses.
+
+The file name keeps it out of the regular test run. Record a baseline and
+compare a later run against it with::
+
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-json=baseline.json
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-json=current.json
+    python benchmarks/compare_benchmarks.py baseline.json current.json
+
+Select sizes by their ids, e.g. ``-k "1k or 10k"`` to skip 100k courses.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import FORMATS, course_key, course_rows, make_courses, write_csv
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+# Rounds of the benchmarks that need a fresh tracker for every round.
+SETUP_ROUNDS = 3
+
+
+@pytest.fixture(scope="module", params=list(SIZES.values()), ids=list(SIZES))
+def size(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def database(size, tmp_path_factory):
+    """A database directory holding ``size`` courses, shared by the module."""
+
+    directory = tmp_path_factory.mktemp(f"db{size}")
+    tracker = CourseTracker(db_directory=directory, load=False)
+    tracker.courses = make_courses(size)
+    tracker.save_courses()
+    tracker.close()
+    return directory
+
+
+@pytest.fixture
+def tracker(database, tmp_path):
+    """A loaded tracker over a private copy of :func:`database`."""
+
+    for path in database.iterdir():
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    tracker = CourseTracker(db_directory=tmp_path)
+    yield tracker
+    tracker.close()
+
+
+def fresh_tracker(database, tmp_path_factory):
+    """Setup for ``benchmark.pedantic``: a new tracker for every round.
+
+    The benchmarked function closes it, as part of the measured operation.
+    """
+
+    directory = tmp_path_factory.mktemp("round")
+    for path in database.iterdir():
+        (directory / path.name).write_bytes(path.read_bytes())
+    return (CourseTracker(db_directory=directory),), {}
+
+
+def test_load(benchmark, database, size):
+    def load():
+        tracker = CourseTracker(db_directory=database)
+        tracker.close()
+        return tracker
+
+    assert len(benchmark(load)) == size
+
+
+def test_add_course(benchmark, tracker, size):
+    names = (f"Nowy {i:07d}" for i in range(10**7))
+    benchmark(lambda: tracker.add_course(next(names), "Wykład"))
+    assert len(tracker) > size
+
+
+def test_get_course(benchmark, tracker, size):
+    name, format = course_key(size // 2)
+    assert benchmark(tracker.get_course, name, format).name == name
+
+
+def test_increment_unattended(benchmark, tracker):
+    benchmark(tracker.increment_unattended, "Kurs 0000000", FORMATS[0])
+    assert tracker.get_course("Kurs 0000000", FORMATS[0]).un_classes == 3
+
+
+def test_decrement_unattended(benchmark, tracker):
+    benchmark(tracker.decrement_unattended, "Kurs 0000003", FORMATS[0])
+    assert tracker.get_course("Kurs 0000003", FORMATS[0]).un_classes == 0
+
+
+def test_save_courses(benchmark, tracker):
+    benchmark(tracker.save_courses)
+
+
+def test_list_courses(benchmark, tracker, size):
+    assert len(benchmark(tracker.list_courses)) == size
+
+
+def test_export_csv(benchmark, tracker, tmp_path):
+    target = tmp_path / "export.csv"
+    benchmark(tracker.export_courses, target)
+    assert target.stat().st_size > 0
+
+
+def benchmark_import(benchmark, database, tmp_path_factory, source, replace):
+    def run(tracker):
+        if replace:
+            report = tracker.import_courses_replace(str(source))
+        else:
+            report = tracker.import_courses_append(str(source))
+        tracker.close()
+        return report
+
+    return benchmark.pedantic(
+        run,
+        setup=lambda: fresh_tracker(database, tmp_path_factory),
+        rounds=SETUP_ROUNDS,
+    )
+
+
+def test_import_replace(benchmark, database, size, tmp_path_factory):
+    source = tmp_path_factory.mktemp("csv") / "replace.csv"
+    write_csv(source, course_rows(size))
+    report = benchmark_import(benchmark, database, tmp_path_factory, source, True)
+    assert report.imported == size
+
+
+def test_import_append(benchmark, database, size, tmp_path_factory):
+    source = tmp_path_factory.mktemp("csv") / "append.csv"
+    write_csv(source, course_rows(size, prefix="Nowy"))
+    report = benchmark_import(benchmark, database, tmp_path_factory, source, False)
+    assert report.imported == size
@@ -0,0 +1,69 @@
+"""Measure streaming CSV import throughput.
+
+Generates a CSV file (1M rows by default), imports it in replace mode and
+reports rows/second together with the peak size of the import buffers.
+Run with::
+
+    python benchmarks/bench_import.py [rows] [batch_size]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_io import batched, iter_csv_rows
+from course_tracker import IMPORT_BATCH_SIZE, CourseTracker
+from synthetic import course_rows, write_csv
+
+
+def write_rows(path: Path, rows: int) -> None:
+    # Every thousandth row is malformed to exercise error reporting.
+    write_csv(
+        path,
+        (
+            (name, format, "x" if i % 1000 == 999 else un_classes)
+            for i, (name, format, un_classes) in enumerate(course_rows(rows))
+        ),
+    )
+
+
+def reader_peak(path: Path, batch_size: int) -> int:
+    """Peak memory of streaming the file through the batching reader."""
+
+    tracemalloc.start()
+    for _ in batched(iter_csv_rows(str(path)), batch_size):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_BATCH_SIZE
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = Path(directory) / "courses.csv"
+        write_rows(csv_file, rows)
+        tracker = CourseTracker(db_directory=directory)
+
+        start = time.perf_counter()
+        report = tracker.import_courses_replace(str(csv_file), batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+
+        print(f"rows: {rows}, batch size: {batch_size}")
+        print(f"imported: {report.imported}, row errors: {len(report.errors)}")
+        print(f"elapsed: {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+        # The reader's footprint is bounded by the batch size, not the file.
+        small_file = Path(directory) / "courses-small.csv"
+        write_rows(small_file, rows // 10)
+        for path, size in ((small_file, rows // 10), (csv_file, rows)):
+            peak = reader_peak(path, batch_size)
+            print(f"reader peak for {size} rows: {peak / 2**10:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the per-keypress listing cost with the previous re-sort.
+
+Every +/- press in the GUI calls ``CourseTracker.list_courses``. This
+measures that call against the old ``sorted(...)`` implementation. Run
+with::
+
+    python benchmarks/bench_listing.py
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import make_courses
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def legacy_list_courses(tracker: CourseTracker):
+    return sorted(tracker._index.values(), key=lambda x: (x.name, x.format))
+
+
+def main() -> None:
+    print(f"{'courses':>8} {'sorted() ms':>12} {'maintained ms':>14} {'speedup':>8}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            tracker = CourseTracker(db_directory=directory)
+            # Shuffled insertion order so the legacy sort has real work to do.
+            tracker.courses = make_courses(i * 7919 % size for i in range(size))
+            number = max(1, 200_000 // size)
+            legacy = min(
+                timeit.repeat(
+                    lambda: legacy_list_courses(tracker), number=number, repeat=3
+                )
+            )
+            current = min(
+                timeit.repeat(tracker.list_courses, number=number, repeat=3)
+            )
+            print(
+                f"{size:>8} {legacy / number * 1000:>12.3f} "
+                f"{current / number * 1000:>14.3f} {legacy / current:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
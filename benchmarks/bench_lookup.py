@@ -0,0 +1,47 @@
+"""Measure keyed lookups and append-imports against a large catalogue.
+
+Run with::
+
+    python benchmarks/bench_lookup.py
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import course_key, course_rows, make_courses, write_csv
+
+SIZE = 100_000
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory)
+        tracker.courses = make_courses(SIZE)
+
+        keys = [course_key(i) for i in range(SIZE)]
+        start = time.perf_counter()
+        for name, format in keys:
+            tracker.get_course(name, format)
+        elapsed = time.perf_counter() - start
+        print(f"get_course x{SIZE}: {elapsed:.3f}s")
+
+        # Half of the imported rows already exist, half are new.
+        csv_file = Path(directory) / "import.csv"
+        write_csv(csv_file, course_rows(range(SIZE // 2, SIZE + SIZE // 2)))
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # duplicate notices
+            tracker.import_courses_append(str(csv_file))
+        elapsed = time.perf_counter() - start
+        print(f"append-import of {SIZE} rows into {SIZE} courses: {elapsed:.3f}s")
+        print(f"courses after import: {len(tracker.courses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the memory footprint of course representations with tracemalloc.
+
+Measures a list of the original ``__dict__``-based course objects, a list
+of ``__slots__`` :class:`Course` objects and a columnar :class:`CourseStore`.
+Run with::
+
+    python benchmarks/bench_memory.py [sizes...]
+"""
+
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import Course
+from course_store import CourseStore
+from synthetic import course_rows
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+class DictCourse:
+    """The pre-``__slots__`` layout: three attributes in a per-instance dict."""
+
+    def __init__(self, name: str, format: str, un_classes: int = 0) -> None:
+        self._name = name
+        self._un_classes = max(0, min(un_classes, 3))
+        self._format = format
+
+
+def rows(size: int):
+    # Formats are built per row, as they would be when parsed from a file.
+    return (
+        (name, "".join(format), un_classes)
+        for name, format, un_classes in course_rows(size)
+    )
+
+
+def build_dict_courses(size: int):
+    return [DictCourse(*row) for row in rows(size)]
+
+
+def build_slots_courses(size: int):
+    return [Course(*row) for row in rows(size)]
+
+
+def build_store(size: int):
+    store = CourseStore()
+    for row in rows(size):
+        store.append(*row)
+    return store
+
+
+def measure(builder, size: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = builder(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    builders = (
+        ("dict Course", build_dict_courses),
+        ("slots Course", build_slots_courses),
+        ("CourseStore", build_store),
+    )
+    print(f"{'courses':>9} " + " ".join(f"{label:>14}" for label, _ in builders))
+    for size in sizes:
+        results = [measure(builder, size) for _, builder in builders]
+        print(
+            f"{size:>9} "
+            + " ".join(f"{value / 2**20:>11.1f} MiB" for value in results)
+        )
+        print(
+            f"{'':>9} "
+            + " ".join(f"{value / size:>10.1f} B/row" for value in results)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure the write cost of a single mutation as the course count grows.
+
+Compares the current write-through persistence with the previous
+truncate-and-reinsert ``save_courses`` strategy. Run with::
+
+    python benchmarks/bench_persistence.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tinydb import TinyDB
+from tinydb.storages import JSONStorage
+
+from course_tracker import CourseTracker
+from storage import AtomicJSONStorage
+from synthetic import course_key, make_courses
+
+SIZES = (100, 500, 1000, 2000)
+MUTATIONS = 20
+
+bytes_written = 0
+_json_write = JSONStorage.write
+
+
+def _counting_write(self, data):
+    global bytes_written
+    _json_write(self, data)
+    bytes_written += self._handle.tell()
+
+
+JSONStorage.write = _counting_write
+_atomic_write = AtomicJSONStorage.write
+
+
+def _counting_atomic_write(self, data):
+    global bytes_written
+    _atomic_write(self, data)
+    bytes_written += os.path.getsize(self.path)
+
+
+AtomicJSONStorage.write = _counting_atomic_write
+
+
+def legacy_save(tracker: CourseTracker) -> None:
+    """The original ``save_courses``: one full-file rewrite per course."""
+
+    db = TinyDB(tracker.database)
+    db.truncate()
+    for course in sorted(tracker.courses, key=lambda x: (x.name, x.format)):
+        db.insert(
+            {
+                "name": course.name,
+                "format": course.format,
+                "un_classes": course.un_classes,
+            }
+        )
+    db.close()
+
+
+def measure(size: int, legacy: bool) -> tuple[float, float]:
+    global bytes_written
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory)
+        tracker.courses = make_courses(size)
+        tracker.save_courses()
+
+        mutations = MUTATIONS if not legacy or size <= 1000 else 3
+        bytes_written = 0
+        start = time.perf_counter()
+        for i in range(mutations):
+            name, format = course_key(i)
+            if legacy:
+                tracker.get_course(name, format).increment_un_classes()
+                legacy_save(tracker)
+            else:
+                tracker.increment_unattended(name, format)
+        elapsed = time.perf_counter() - start
+        return elapsed / mutations, bytes_written / mutations
+
+
+def main() -> None:
+    print(f"{'courses':>8} {'strategy':>12} {'ms/mutation':>12} {'KiB/mutation':>13}")
+    for size in SIZES:
+        for legacy in (True, False):
+            seconds, written = measure(size, legacy)
+            strategy = "truncate" if legacy else "write-through"
+            print(
+                f"{size:>8} {strategy:>12} {seconds * 1000:>12.2f} "
+                f"{written / 1024:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
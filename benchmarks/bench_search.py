@@ -0,0 +1,73 @@
+"""Measure course search latency on catalogues of realistic Polish names.
+
+Reports the one-off index build and, for a set of queries, the mean time
+of a substring and of a prefix search. Run with::
+
+    python benchmarks/bench_search.py
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import Course
+from course_tracker import CourseTracker
+from synthetic import FORMATS
+
+SIZES = (1_000, 10_000, 100_000)
+ROUNDS = 20
+WORDS = (
+    "Analiza matematyczna Algebra liniowa Fizyka kwantowa Programowanie "
+    "obiektowe Bazy danych Systemy operacyjne Sieci komputerowe Język "
+    "angielski Chemia organiczna Mechanika płynów Grafika komputerowa "
+    "Inżynieria oprogramowania Statystyka Ekonomia Logika Kryptografia "
+    "Uczenie maszynowe Elektronika Równania różniczkowe Socjologia"
+).split()
+QUERIES = ("k", "kr", "krypto", "uczenie masz", "rownania rozn", "zzz")
+
+
+def catalogue(size: int) -> list:
+    rng = random.Random(size)
+    names = set()
+    while len(names) * len(FORMATS) < size:
+        words = rng.sample(WORDS, rng.randint(2, 3))
+        names.add(" ".join(words).capitalize() + f" {rng.randint(1, 999)}")
+    courses = [Course(name, format) for name in names for format in FORMATS]
+    return courses[:size]
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = function(*args, **kwargs)
+    return (time.perf_counter() - start) / ROUNDS, result
+
+
+def main() -> None:
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            tracker = CourseTracker(db_directory=directory, load=False)
+            tracker.courses = catalogue(size)
+            start = time.perf_counter()
+            tracker.search("-")
+            build = time.perf_counter() - start
+            print(f"{size} courses, index built in {build * 1000:.1f} ms")
+            print(
+                f"  {'query':<16} {'hits':>6} {'substring ms':>13} "
+                f"{'hits':>6} {'prefix ms':>10}"
+            )
+            for query in QUERIES:
+                substring, found = timed(tracker.search, query)
+                prefix, started = timed(tracker.search, query, prefix=True)
+                print(
+                    f"  {query:<16} {len(found):>6} {substring * 1000:>13.3f} "
+                    f"{len(started):>6} {prefix * 1000:>10.3f}"
+                )
+            tracker.close()
+
+
+if __name__ == "__main__":
+    main()
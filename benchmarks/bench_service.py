@@ -0,0 +1,157 @@
+"""Load-test the HTTP service: requests/second and latency percentiles.
+
+Without ``--url`` a service is started on a free port over a temporary
+database seeded with ``--courses`` courses. Every client keeps one
+connection alive and issues requests back to back; ``--write-ratio`` of
+them are ``inc``/``dec`` calls, the rest fetch a page of courses. Run with::
+
+    python benchmarks/bench_service.py [--clients 32] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from course_tracker import CourseTracker
+from synthetic import make_courses
+
+
+class Client:
+    """A minimal keep-alive HTTP/1.1 client."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple:
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        return status, await self.reader.readexactly(length)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def run_client(host, port, keys, requests, write_ratio, latencies, seed):
+    rng = random.Random(seed)
+    client = Client(host, port)
+    await client.connect()
+    try:
+        for _ in range(requests):
+            if rng.random() < write_ratio:
+                name, format = rng.choice(keys)
+                op = rng.choice(("inc", "dec"))
+                method, path = "POST", f"/courses/{quote(name)}/{quote(format)}/{op}"
+            else:
+                offset = rng.randrange(max(1, len(keys) - 50))
+                method, path = "GET", f"/courses?offset={offset}&limit=50"
+            start = time.perf_counter()
+            status, _ = await client.request(method, path)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"{method} {path} -> {status}")
+    finally:
+        client.close()
+
+
+async def load_test(host, port, clients, requests, write_ratio):
+    probe = Client(host, port)
+    await probe.connect()
+    status, body = await probe.request("GET", f"/courses?limit={10**9}")
+    probe.close()
+    keys = [(c["name"], c["format"]) for c in json.loads(body)["courses"]]
+    if not keys:
+        raise RuntimeError("the service has no courses to exercise")
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(host, port, keys, requests, write_ratio, latencies, seed)
+            for seed in range(clients)
+        )
+    )
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def start_service(directory: str, courses: int):
+    tracker = CourseTracker(db_directory=directory)
+    tracker.courses = make_courses(courses)
+    tracker.save_courses()
+    tracker.close()
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "service.py", "--db-directory", directory, "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    process.stdout.readline()  # "Serving ..." once it listens
+    return process, port
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing service, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="per client")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as directory:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port
+        else:
+            process, port = start_service(directory, args.courses)
+            host = "127.0.0.1"
+        try:
+            elapsed, latencies = asyncio.run(
+                load_test(host, port, args.clients, args.requests, args.write_ratio)
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(
+        f"{len(latencies)} requests, {args.clients} clients, "
+        f"{args.write_ratio:.0%} writes"
+    )
+    print(f"throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(
+        f"latency ms: p50 {percentile(0.5):.2f}  p90 {percentile(0.9):.2f}  "
+        f"p99 {percentile(0.99):.2f}  max {latencies[-1] * 1000:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
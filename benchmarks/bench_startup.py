@@ -0,0 +1,95 @@
+"""Measure cold-start cost: module import time and time to first paint.
+
+Import time comes from ``python -X importtime``. Time to first paint and
+time until all courses are in the Treeview are measured in a child process
+against a generated database and need a display; they are skipped without
+one. Run with::
+
+    python benchmarks/bench_startup.py [courses]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from course_tracker import CourseTracker
+from synthetic import make_courses
+
+CHILD = """
+import sys, time
+start = time.perf_counter()
+import tkinter as tk
+from course_tracker import CourseTracker
+from course_tracker_gui import CourseTrackerGUI
+
+root = tk.Tk()
+app = CourseTrackerGUI(root, CourseTracker(db_directory=sys.argv[1], load=False))
+root.update()
+print("first paint", time.perf_counter() - start, flush=True)
+
+def wait_loaded():
+    if app.loading:
+        root.after(5, wait_loaded)
+    else:
+        print("all courses shown", time.perf_counter() - start, flush=True)
+        root.destroy()
+
+wait_loaded()
+root.mainloop()
+"""
+
+
+def import_times(module: str, top: int = 8) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        entries.append((int(cumulative), name.rstrip()))
+    total = next(us for us, name in reversed(entries) if name.strip() == module)
+    print(f"import {module}: {total / 1000:.1f} ms cumulative")
+    for us, name in sorted(entries, reverse=True)[1 : top + 1]:
+        print(f"  {us / 1000:>7.1f} ms {name}")
+
+
+def first_paint(size: int) -> None:
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("time to first paint: skipped (no DISPLAY)")
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory)
+        tracker.courses = make_courses(size)
+        tracker.save_courses()
+        tracker.close()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, directory],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    for line in result.stdout.splitlines():
+        label, seconds = line.rsplit(" ", 1)
+        print(f"{label} with {size} courses: {float(seconds) * 1000:.1f} ms")
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    import_times("course_tracker")
+    import_times("course_tracker_gui")
+    first_paint(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure grouped changes in one transaction against saving them one by one.
+
+Starts from ``size`` stored courses and applies ``changes`` attendance
+changes, then adds and removes as many courses: each change on its own, as
+one :meth:`CourseTracker.transaction`, and through the bulk methods. Run
+with::
+
+    python benchmarks/bench_transactions.py [size] [changes] [backend]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import course_key, make_courses
+
+
+def one_by_one(tracker, keys, new):
+    for key in keys:
+        tracker.increment_unattended(*key)
+    for key in new:
+        tracker.add_course(*key)
+    for key in new:
+        tracker.remove_course(*key)
+
+
+def in_transaction(tracker, keys, new):
+    with tracker.transaction():
+        one_by_one(tracker, keys, new)
+
+
+def bulk(tracker, keys, new):
+    tracker.apply_deltas((key, 1) for key in keys)
+    tracker.add_courses(new)
+    tracker.remove_courses(new)
+
+
+def timed(run, size: int, changes: int, backend: str) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(db_directory=directory, backend=backend)
+        tracker.courses = make_courses(size)
+        tracker.save_courses()
+        keys = [course_key(i) for i in range(changes)]
+        new = [course_key(i, prefix="Nowy") for i in range(changes)]
+        start = time.perf_counter()
+        run(tracker, keys, new)
+        tracker.flush()
+        elapsed = time.perf_counter() - start
+        tracker.close()
+    return elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    backend = sys.argv[3] if len(sys.argv) > 3 else "tinydb"
+    print(f"{size} courses, 3 x {changes} changes, {backend}")
+    baseline = None
+    for label, run in (
+        ("one by one", one_by_one),
+        ("transaction", in_transaction),
+        ("bulk methods", bulk),
+    ):
+        elapsed = timed(run, size, changes, backend)
+        baseline = baseline or elapsed
+        print(f"{label:>12}: {elapsed:8.3f} s ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
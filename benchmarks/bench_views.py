@@ -0,0 +1,58 @@
+"""Measure what the view cache saves on repeated GUI-style reads.
+
+Each round reads the sorted listing, one format's courses and the string
+renderings, and every tenth round records an absence first. Runs with the
+cache disabled and enabled. Run with::
+
+    python benchmarks/bench_views.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from synthetic import course_key, make_courses
+
+SIZES = (1_000, 10_000, 100_000)
+ROUNDS = 50
+
+
+def measure(size: int, cache_size: int) -> tuple:
+    with tempfile.TemporaryDirectory() as directory:
+        tracker = CourseTracker(
+            db_directory=directory, load=False, view_cache_size=cache_size
+        )
+        tracker.courses = make_courses(size)
+        tracker.enable_write_behind()
+        start = time.perf_counter()
+        for i in range(ROUNDS):
+            if i % 10 == 0:
+                tracker.increment_unattended(*course_key(i))
+            tracker.list_courses()
+            tracker.courses_by_format("Wykład")
+            tracker.list_courses_str()
+        elapsed = time.perf_counter() - start
+        stats = tracker.view_cache.stats()
+        tracker.close()
+        return elapsed / ROUNDS, stats
+
+
+def main() -> None:
+    print(
+        f"{'courses':>8} {'uncached ms':>12} {'cached ms':>10} "
+        f"{'speedup':>8} hits/misses"
+    )
+    for size in SIZES:
+        uncached, _ = measure(size, 0)
+        cached, stats = measure(size, 32)
+        print(
+            f"{size:>8} {uncached * 1000:>12.2f} {cached * 1000:>10.2f} "
+            f"{uncached / cached:>7.1f}x {stats['hits']}/{stats['misses']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
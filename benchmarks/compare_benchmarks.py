@@ -0,0 +1,84 @@
+"""Compare two pytest-benchmark JSON files and flag regressions.
+
+Benchmarks are matched by test name. Any benchmark whose chosen statistic
+grew by more than ``--threshold`` percent over the baseline is reported,
+and the exit status is then 1. Run with::
+
+    python benchmarks/compare_benchmarks.py baseline.json current.json \\
+        [--threshold 10] [--stat median]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+STATS = ("min", "max", "mean", "median")
+
+
+def load(path: str, stat: str) -> Dict[str, float]:
+    """Map ``file::test[param]`` to ``stat`` in seconds."""
+
+    with open(path, encoding="utf-8") as handle:
+        benchmarks = json.load(handle)["benchmarks"]
+    # Drop the directory, so runs started from different places still match.
+    return {
+        benchmark["fullname"].rsplit("/", 1)[-1]: benchmark["stats"][stat]
+        for benchmark in benchmarks
+    }
+
+
+def compare(
+    baseline: Dict[str, float], current: Dict[str, float], threshold: float
+) -> List[Tuple[str, float, float, float, bool]]:
+    """Rows of ``(name, baseline, current, change %, regressed)``."""
+
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[name], current[name]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="allowed slowdown in percent"
+    )
+    parser.add_argument("--stat", choices=STATS, default="median")
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline, args.stat)
+    current = load(args.current, args.stat)
+    rows = compare(baseline, current, args.threshold)
+
+    width = max([len(row[0]) for row in rows] + [9])
+    header = f"{'baseline µs':>12} {'current µs':>12} {'change':>8}"
+    print(f"{'benchmark':<{width}} {header}")
+    for name, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<{width}} {old * 1e6:>12.1f} {new * 1e6:>12.1f} "
+            f"{change:>+7.1f}%{flag}"
+        )
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"missing from current run: {name}")
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f"new, no baseline: {name}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(
+            f"{len(regressions)} of {len(rows)} benchmarks slower by more than "
+            f"{args.threshold:g}% ({args.stat})",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Synthetic course datasets shared by the benchmark scripts.
+
+Course ``i`` is named ``"Kurs 0000042"`` (or another prefix), cycles
+through the three standard formats and has ``i % 4`` unattended classes,
+so every attendance level is represented and any course can be addressed
+again by its number.
+"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import FORMATS, Course
+
+
+def course_key(i: int, prefix: str = "Kurs") -> Tuple[str, str]:
+    """``(name, format)`` of course number ``i``."""
+
+    return f"{prefix} {i:07d}", FORMATS[i % 3]
+
+
+def course_rows(
+    courses: int | Iterable[int], prefix: str = "Kurs"
+) -> Iterator[Tuple[str, str, int]]:
+    """``(name, format, un_classes)`` rows for a count or numbers of courses."""
+
+    numbers = range(courses) if isinstance(courses, int) else courses
+    for i in numbers:
+        yield f"{prefix} {i:07d}", FORMATS[i % 3], i % 4
+
+
+def make_courses(courses: int | Iterable[int], prefix: str = "Kurs") -> List[Course]:
+    """:class:`Course` objects for :func:`course_rows`."""
+
+    return [Course(*row) for row in course_rows(courses, prefix)]
+
+
+def write_csv(path: str | Path, rows: Iterable[tuple]) -> None:
+    """Write ``rows`` as an importable CSV file with the usual header."""
+
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Nazwa", "Format", "Opuszczone"])
+        writer.writerows(rows)
@@ -1,4 +1,12 @@
+# Row colour for 0, 1, 2 and 3 (the maximum) unattended classes.
+ATTENDANCE_TAGS = ("green", "yellow", "orange", "red")
+# Formats offered when adding a course; imports may bring in others.
+FORMATS = ("Audytorium", "Wykład", "Laboratorium")
+
+
 class Course:
+    __slots__ = ("_name", "_un_classes", "_format")
+
     def __init__(self, name: str, format: str, un_classes: int = 0) -> None:
         self._name = name
         self._un_classes = max(0, min(un_classes, 3))
@@ -0,0 +1,214 @@
+import csv
+import io
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, TypeVar
+
+from course import Course
+
+CSV_FIELDS = ["Nazwa", "Format", "Opuszczone"]
+
+T = TypeVar("T")
+
+
+class RowError:
+    """A CSV row that could not be imported."""
+
+    def __init__(self, line: int, message: str) -> None:
+        self.line = line
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"RowError({self.line!r}, {self.message!r})"
+
+
+class ImportReport:
+    """Outcome of importing a single CSV file."""
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.imported = 0
+        self.skipped = 0
+        self.errors: List[RowError] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"ImportReport({self.filename!r}, imported={self.imported}, "
+            f"skipped={self.skipped}, errors={len(self.errors)})"
+        )
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def rows(self) -> int:
+        """Data rows read from the file, whether imported or not."""
+
+        return self.imported + self.skipped + len(self.errors)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of at most ``size`` items."""
+
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_csv_rows(filename: str) -> Iterator[Tuple[int, List[str]]]:
+    """Stream ``(line_number, row)`` pairs from a course CSV file.
+
+    The header row and blank lines are skipped. The file is read lazily, so
+    memory use does not depend on its size.
+    """
+
+    with open(filename, "r", newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None)  # Skip header
+        for row in reader:
+            if row:
+                yield reader.line_num, row
+
+
+def parse_course_row(row: List[str]) -> Course:
+    """Validate a CSV row and turn it into a :class:`Course`.
+
+    Raises ``ValueError`` describing the problem for malformed rows.
+    """
+
+    if len(row) < 3:
+        raise ValueError(f"expected 3 columns, got {len(row)}")
+    name, format, un_classes = row[0], row[1], row[2]
+    if not name:
+        raise ValueError("missing course name")
+    if not format:
+        raise ValueError("missing course format")
+    try:
+        return Course(name, format, int(un_classes))
+    except ValueError:
+        raise ValueError(
+            f"invalid number of unattended classes: {un_classes!r}"
+        ) from None
+
+
+ParsedCSV = Tuple[List[str], List[str], List[int], List[RowError]]
+
+
+def read_courses_csv(filename: str) -> ParsedCSV:
+    """Parse a whole course CSV file into columns.
+
+    Returns the names, formats and unattended classes of the valid rows as
+    three lists, which pickle far faster than courses when the file is
+    parsed in a worker process, and the errors of the others. A file that
+    cannot be read adds an error for line 0.
+    """
+
+    names: List[str] = []
+    formats: List[str] = []
+    un_classes: List[int] = []
+    errors: List[RowError] = []
+    try:
+        for line, row in iter_csv_rows(filename):
+            try:
+                course = parse_course_row(row)
+            except ValueError as e:
+                errors.append(RowError(line, str(e)))
+                continue
+            names.append(course.name)
+            formats.append(course.format)
+            un_classes.append(course.un_classes)
+    except (csv.Error, OSError, UnicodeDecodeError) as e:
+        errors.append(RowError(0, str(e)))
+    return names, formats, un_classes, errors
+
+
+def read_csv_files(
+    filenames: List[str], workers: Optional[int] = None
+) -> Iterator[ParsedCSV]:
+    """Parse CSV files with :func:`read_courses_csv` in a process pool.
+
+    Results are yielded in the order of ``filenames`` as soon as each file
+    is parsed. ``workers`` defaults to the number of CPUs; with one worker
+    or one file everything runs in this process. Workers are spawned rather
+    than forked, since the caller may be running threads.
+    """
+
+    if workers == 1 or len(filenames) < 2:
+        yield from map(read_courses_csv, filenames)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as executor:
+        yield from executor.map(read_courses_csv, filenames)
+
+
+def write_courses_csv(courses: Iterable[Course], handle: TextIO) -> None:
+    writer = csv.writer(handle)
+    writer.writerow(CSV_FIELDS)
+    writer.writerows(
+        (course.name, course.format, str(course.un_classes)) for course in courses
+    )
+
+
+def write_courses_jsonl(courses: Iterable[Course], handle: TextIO) -> None:
+    import json
+
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    handle.writelines(
+        encode(
+            {
+                "name": course.name,
+                "format": course.format,
+                "un_classes": course.un_classes,
+            }
+        )
+        + "\n"
+        for course in courses
+    )
+
+
+EXPORT_WRITERS = {"csv": write_courses_csv, "jsonl": write_courses_jsonl}
+
+
+def export_format_for(filename: str) -> str:
+    """Guess the export format from the file name, defaulting to CSV."""
+
+    name = str(filename).lower().removesuffix(".gz")
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+@contextmanager
+def open_export(
+    filename: str, compress: bool, encoding: Optional[str] = None
+) -> Iterator[TextIO]:
+    """Open ``filename`` for streaming text output.
+
+    ``"-"`` writes to standard output, so exports can be piped. With
+    ``compress`` the stream is gzip-compressed on the fly.
+    """
+
+    if compress:
+        import gzip
+
+    if str(filename) == "-":
+        if compress:
+            with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as raw:
+                with io.TextIOWrapper(raw, encoding=encoding, newline="") as handle:
+                    yield handle
+        else:
+            yield sys.stdout
+            sys.stdout.flush()
+    elif compress:
+        with gzip.open(filename, "wt", newline="", encoding=encoding) as handle:
+            yield handle
+    else:
+        with open(filename, "w", newline="", encoding=encoding) as handle:
+            yield handle
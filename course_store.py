@@ -0,0 +1,103 @@
+import sys
+from array import array
+from typing import Iterable, Iterator, List
+
+from course import Course
+
+
+class CourseView(Course):
+    """A :class:`Course` backed by one row of a :class:`CourseStore`.
+
+    Views are created on demand and hold only a reference to the store and a
+    row number; reads and writes go straight to the store's columns, with the
+    same clamping as :class:`Course`.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "CourseStore", row: int) -> None:
+        self._store = store
+        self._row = row
+
+    @property
+    def name(self) -> str:
+        return self._store._names[self._row]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._store._names[self._row] = sys.intern(value)
+
+    @property
+    def un_classes(self) -> int:
+        return self._store._un_classes[self._row]
+
+    @un_classes.setter
+    def un_classes(self, value: int) -> None:
+        self._store._un_classes[self._row] = max(0, min(value, 3))
+
+    @property
+    def format(self) -> str:
+        return self._store._formats[self._row]
+
+    @format.setter
+    def format(self, value: str) -> None:
+        self._store._formats[self._row] = sys.intern(value)
+
+
+class CourseStore:
+    """Columnar storage for large course catalogues.
+
+    Names and formats are kept as interned strings, so the handful of
+    distinct formats are shared, and unattended classes live in a compact
+    ``array('B')``. Indexing or iterating yields :class:`CourseView` objects.
+    Views address rows by position, so deleting a row shifts the views that
+    follow it.
+    """
+
+    def __init__(self, courses: Iterable[Course] = ()) -> None:
+        self._names: List[str] = []
+        self._formats: List[str] = []
+        self._un_classes = array("B")
+        self.extend(courses)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, row: int) -> CourseView:
+        if row < 0:
+            row += len(self._names)
+        if not 0 <= row < len(self._names):
+            raise IndexError("CourseStore index out of range")
+        return CourseView(self, row)
+
+    def __delitem__(self, row: int) -> None:
+        del self._names[row]
+        del self._formats[row]
+        del self._un_classes[row]
+
+    def __iter__(self) -> Iterator[CourseView]:
+        return (CourseView(self, row) for row in range(len(self._names)))
+
+    @property
+    def un_classes(self) -> array:
+        """The raw ``array('B')`` column of unattended classes."""
+
+        return self._un_classes
+
+    @property
+    def formats(self) -> List[str]:
+        return self._formats
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    def append(self, name: str, format: str, un_classes: int = 0) -> CourseView:
+        self._names.append(sys.intern(name))
+        self._formats.append(sys.intern(format))
+        self._un_classes.append(max(0, min(un_classes, 3)))
+        return CourseView(self, len(self._names) - 1)
+
+    def extend(self, courses: Iterable[Course]) -> None:
+        for course in courses:
+            self.append(course.name, course.format, course.un_classes)
@@ -1,15 +1,42 @@
+import bisect
 import csv
 import os
 import platform
-from typing import List
-
-from tinydb import TinyDB
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
 
 from course import Course
+from course_io import (
+    EXPORT_WRITERS,
+    ImportReport,
+    RowError,
+    batched,
+    export_format_for,
+    iter_csv_rows,
+    open_export,
+    parse_course_row,
+    read_csv_files,
+)
+from storage import BACKENDS, CourseKey, StorageBackend
+from view_cache import DEFAULT_VIEW_CACHE_SIZE, ViewCache
+from write_behind import DEFAULT_BATCH_SIZE, DEFAULT_DEBOUNCE, WriteBehindQueue
+
+IMPORT_BATCH_SIZE = 10_000
+# How import_courses_bulk() resolves a course imported more than once.
+CONFLICT_POLICIES = ("skip", "overwrite", "sum")
 
 
 class CourseTracker:
-    def __init__(self, db_directory: str | None = None) -> None:
+    def __init__(
+        self,
+        db_directory: str | None = None,
+        backend: str = "tinydb",
+        load: bool = True,
+        view_cache_size: int = DEFAULT_VIEW_CACHE_SIZE,
+    ) -> None:
         """Create a tracker instance.
 
         Parameters
@@ -17,24 +44,255 @@ class CourseTracker:
         db_directory:
             Optional path where the database file should be stored. When not
             provided the directory is resolved based on the operating system.
+        backend:
+            Storage engine, one of :data:`storage.BACKENDS` (``"tinydb"`` for
+            the JSON file, ``"sqlite"`` for an SQLite database, ``"eventlog"``
+            for an append-only event log).
+        load:
+            Read the stored courses right away. Pass ``False`` to open the
+            store without parsing it and call :meth:`load_courses` later,
+            e.g. from a background thread.
+        view_cache_size:
+            How many derived views (listings, string renderings, per-format
+            views) :attr:`view_cache` keeps; ``0`` disables caching.
         """
 
-        self.courses: List[Course] = []
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown storage backend: {backend}")
+        self._index: Dict[CourseKey, Course] = {}
+        self._keys: List[CourseKey] = []
+        # Views are cached against these versions; see _changed().
+        self.view_cache = ViewCache(view_cache_size)
+        self._version = 0  # any change
+        self._keys_version = 0  # courses added or removed
+        self._generation = 0  # whole collection replaced
+        # Courses of a format added or removed, since the last generation.
+        self._format_versions: Dict[str, int] = {}
+        self._search_index = None  # built on the first search()
         self.db_directory = db_directory
-        self.create_database()
+        self.backend_name = backend
+        self.write_queue: WriteBehindQueue | None = None
+        # While a transaction is open: how to undo each change made in it,
+        # and whether it has to rewrite the whole store on commit.
+        self._undo: List[Callable[[], None]] | None = None
+        self._rewrite = False
+        self.create_database(load)
+
+    @property
+    def courses(self) -> List[Course]:
+        """All courses, ordered by ``(name, format)``.
+
+        Courses are stored in a dict keyed by ``(name, format)``, so lookups,
+        duplicate checks and removals are constant-time, next to a sorted list
+        of keys maintained with :mod:`bisect`. Assigning a new iterable
+        replaces the whole collection and rebuilds both.
+        """
+
+        return list(map(self._index.__getitem__, self._keys))
+
+    @courses.setter
+    def courses(self, courses: Iterable[Course]) -> None:
+        if self._undo is not None:
+            previous = list(self._index.values())
+            self._undo.append(lambda: setattr(self, "courses", previous))
+        self._index = {(course.name, course.format): course for course in courses}
+        self._keys = sorted(self._index)
+        self._search_index = None
+        self._generation += 1
+        self._format_versions = {}
+        self._changed()
+
+    def _changed(self, formats: Iterable[str] = (), membership: bool = True) -> None:
+        """Record a change so that cached views depending on it are rebuilt.
+
+        ``membership`` is false when courses only changed their attendance,
+        which leaves listings of course objects valid.
+        """
+
+        self._version += 1
+        if membership:
+            self._keys_version += 1
+            for format in formats:
+                self._format_versions[format] = self._format_versions.get(format, 0) + 1
+
+    def _index_course(self, course: Course) -> None:
+        key = (course.name, course.format)
+        if self._undo is not None:
+            self._undo.append(lambda: self._unindex_course(key))
+        self._index[key] = course
+        bisect.insort(self._keys, key)
+        if self._search_index is not None:
+            self._search_index.add(key)
+        self._changed((course.format,))
+
+    def _unindex_course(self, key: CourseKey) -> None:
+        course = self._index.pop(key, None)
+        if course is not None:
+            if self._undo is not None:
+                self._undo.append(lambda: self._index_course(course))
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            if self._search_index is not None:
+                self._search_index.remove(key)
+            self._changed((key[1],))
+
+    def _merge_courses(self, added: Dict[CourseKey, Course]) -> None:
+        """Index many new courses at once.
+
+        Small batches are insorted one by one; large ones are cheaper to merge
+        by re-sorting the key list once (timsort exploits the existing run).
+        """
+
+        if self._undo is not None and added:
+            keys = list(added)
+            self._undo.append(lambda: self._unindex_courses(keys))
+        self._index.update(added)
+        if len(added) < 64:
+            for key in added:
+                bisect.insort(self._keys, key)
+        else:
+            self._keys.extend(added)
+            self._keys.sort()
+        if self._search_index is not None:
+            self._search_index.add_many(added)
+        if added:
+            self._changed({format for _, format in added})
+
+    def _unindex_courses(self, keys: List[CourseKey]) -> None:
+        """Drop many courses at once, filtering the key list in one pass."""
+
+        if len(keys) < 64:
+            for key in keys:
+                self._unindex_course(key)
+            return
+        removed = set()
+        for key in keys:
+            course = self._index.pop(key, None)
+            if course is not None:
+                removed.add(key)
+                if self._undo is not None:
+                    self._undo.append(lambda course=course: self._index_course(course))
+        if removed:
+            self._keys = [key for key in self._keys if key not in removed]
+            self._search_index = None
+            self._changed({format for _, format in removed})
+
+    def _set_un_classes(self, course: Course, un_classes: int) -> None:
+        """Change attendance; clamped by :class:`Course`, undone on rollback."""
+
+        if self._undo is not None:
+            previous = course.un_classes
+            self._undo.append(lambda: setattr(course, "un_classes", previous))
+        course.un_classes = un_classes
+
+    def _add_un_classes(self, course: Course, delta: int) -> None:
+        """Change attendance by ``delta`` and save the course.
+
+        The event history records the change left after clamping, so a
+        press at the limit is not counted as an absence.
+        """
+
+        previous = course.un_classes
+        self._set_un_classes(course, previous + delta)
+        self._save_course(course, delta=course.un_classes - previous)
+
+    @contextmanager
+    def transaction(self) -> Iterator["CourseTracker"]:
+        """Group changes so that they are persisted in a single commit.
+
+        Inside the block every mutator updates memory as usual, but nothing
+        is written until the block ends; then all changes go to the store in
+        one write (one rewrite if the block replaced the whole collection).
+        If the block raises, or the commit fails, the changes are undone in
+        memory, nothing is written and the exception propagates. A
+        transaction opened inside another one joins it.
+        """
+
+        if self._undo is not None:
+            yield self
+            return
+
+        self.flush()
+        previous_queue = self.write_queue
+        queue = self.write_queue = WriteBehindQueue(self.backend, debounce=None)
+        undo = self._undo = []
+        self._rewrite = False
+        try:
+            yield self
+            self._undo = None
+            if self._rewrite:
+                # The rewrite stores the final state, covering queued changes.
+                queue.discard()
+                self.backend.replace(map(self._index.__getitem__, self._keys))
+            else:
+                upserts, deletes, events = queue.take()
+                if upserts or deletes:
+                    self.backend.write(upserts, deletes, events)
+        except BaseException:
+            self._undo = None
+            queue.discard()
+            for action in reversed(undo):
+                action()
+            self._changed()
+            raise
+        finally:
+            self.write_queue = previous_queue
+            self._rewrite = False
 
     def add_course(self, name: str, format: str, un_classes: int = 0) -> None:
-        for course in self.courses:
-            if course.name == name and course.format == format:
-                raise ValueError("Ten kurs juz istnieje")
-        self.courses.append(Course(name, format, un_classes))
-        self.save_courses()
+        if (name, format) in self._index:
+            raise ValueError("Ten kurs juz istnieje")
+        course = Course(name, format, un_classes)
+        self._index_course(course)
+        self._save_course(course)
 
     def remove_course(self, name: str, format: str) -> None:
-        for course in self.courses:
-            if course.name == name and course.format == format:
-                self.courses.remove(course)
-        self.save_courses()
+        self._unindex_course((name, format))
+        self._delete_course(name, format)
+
+    def add_courses(self, courses: Iterable[Tuple]) -> None:
+        """Add many courses, given as ``(name, format[, un_classes])`` tuples.
+
+        All of them are persisted in one write. Like :meth:`add_course` this
+        raises ``ValueError`` for a course that already exists, also within
+        ``courses``, and then adds none of them.
+        """
+
+        added: Dict[CourseKey, Course] = {}
+        for name, format, *un_classes in courses:
+            key = (name, format)
+            if key in self._index or key in added:
+                raise ValueError("Ten kurs juz istnieje")
+            added[key] = Course(name, format, *un_classes)
+        with self.transaction():
+            self._merge_courses(added)
+            for course in added.values():
+                self._save_course(course)
+
+    def remove_courses(self, keys: Iterable[CourseKey]) -> None:
+        """Remove many courses, given as ``(name, format)``, in one write."""
+
+        keys = list(keys)
+        with self.transaction():
+            self._unindex_courses(keys)
+            for name, format in keys:
+                self._delete_course(name, format)
+
+    def apply_deltas(
+        self, deltas: Mapping[CourseKey, int] | Iterable[Tuple[CourseKey, int]]
+    ) -> None:
+        """Change the unattended classes of many courses in one write.
+
+        ``deltas`` maps ``(name, format)`` to the number of classes to add,
+        negative to take back; the result is clamped like single increments.
+        Raises ``ValueError`` without changing anything if a course does not
+        exist.
+        """
+
+        items = deltas.items() if isinstance(deltas, Mapping) else deltas
+        with self.transaction():
+            for (name, format), delta in items:
+                self._add_un_classes(self.get_course(name, format), delta)
+            self._changed(membership=False)
 
     def reset_data(self) -> None:
         self.courses = []
@@ -42,29 +300,162 @@ class CourseTracker:
 
     # Type cheking for tinydb??
     def get_course(self, name: str, format: str):
-        for course in self.courses:
-            if course.name == name and course.format == format:
-                return course
-        raise ValueError("Ten kurs nie istnieje")
+        try:
+            return self._index[(name, format)]
+        except KeyError:
+            raise ValueError("Ten kurs nie istnieje") from None
+
+    def _sorted_view(self) -> List[Course]:
+        """The cached sorted listing itself; callers must not modify it."""
+
+        return self.view_cache.get("courses", self._keys_version, lambda: self.courses)
 
     def list_courses(self) -> List[Course]:
-        return sorted(self.courses, key=lambda x: (x.name, x.format))
+        """All courses in ``(name, format)`` order, served from the view cache."""
+
+        return list(self._sorted_view())
+
+    def courses_by_format(self, format: str) -> List[Course]:
+        """The courses of one format in name order, served from the view cache."""
+
+        version = (self._generation, self._format_versions.get(format, 0))
+        return list(
+            self.view_cache.get(
+                ("format", format),
+                version,
+                lambda: [
+                    course for course in self._sorted_view() if course.format == format
+                ],
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: CourseKey) -> bool:
+        """Whether a course ``(name, format)`` exists."""
+
+        return key in self._index
+
+    def course_at(self, position: int) -> Course:
+        """Return the course at ``position`` in ``(name, format)`` order."""
+
+        return self._index[self._keys[position]]
+
+    def course_slice(self, start: int, stop: int) -> List[Course]:
+        """Return courses ``start:stop`` in ``(name, format)`` order."""
+
+        return list(map(self._index.__getitem__, self._keys[start:stop]))
+
+    def course_position(self, name: str, format: str) -> int:
+        """Return the position of a course in ``(name, format)`` order."""
+
+        position = bisect.bisect_left(self._keys, (name, format))
+        if position == len(self._keys) or self._keys[position] != (name, format):
+            raise ValueError("Ten kurs nie istnieje")
+        return position
+
+    def search(
+        self,
+        query: str = "",
+        prefix: bool = False,
+        format: str | None = None,
+        min_un_classes: int | None = None,
+        max_un_classes: int | None = None,
+        limit: int | None = None,
+    ) -> List[Course]:
+        """Find courses by name, in ``(name, format)`` order.
+
+        Matching ignores case and diacritics, so ``"wyklad"`` finds
+        ``"Wykład"``. The search index is built on the first call and kept
+        up to date as courses are added and removed.
+
+        Parameters
+        ----------
+        query:
+            Text to look for in course names; empty matches every course.
+        prefix:
+            Match only names starting with ``query`` instead of containing it.
+        format:
+            Only courses of this format.
+        min_un_classes, max_un_classes:
+            Inclusive bounds on the number of unattended classes.
+        limit:
+            Return at most this many courses.
+        """
+
+        from search_index import SearchIndex, fold
+
+        courses: Iterable[Course]
+        if not fold(query) and format is None:
+            courses = self._sorted_view()
+        elif not fold(query):
+            courses = self.courses_by_format(format)
+        else:
+            if self._search_index is None:
+                self._search_index = SearchIndex(self._keys)
+            keys = self._search_index.search(query, prefix, format)
+            courses = map(self._index.__getitem__, keys)
+        if min_un_classes is not None or max_un_classes is not None:
+            low = 0 if min_un_classes is None else min_un_classes
+            high = 3 if max_un_classes is None else max_un_classes
+            courses = (course for course in courses if low <= course.un_classes <= high)
+        return list(islice(courses, limit))
 
     def list_courses_str(self) -> list[str]:
-        return [str(course) for course in self.courses]
+        return list(
+            self.view_cache.get(
+                "strings",
+                self._version,
+                lambda: [str(course) for course in self._sorted_view()],
+            )
+        )
 
     def increment_unattended(self, name: str, format: str) -> None:
-        course = self.get_course(name, format)
-        course.increment_un_classes()
-        self.save_courses()
+        self._add_un_classes(self.get_course(name, format), 1)
+        self._changed(membership=False)
 
     def decrement_unattended(self, name: str, format: str) -> None:
-        course = self.get_course(name, format)
-        course.decrement_un_classes()
-        self.save_courses()
+        self._add_un_classes(self.get_course(name, format), -1)
+        self._changed(membership=False)
+
+    def absences(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        name: str | None = None,
+        format: str | None = None,
+    ) -> List[tuple]:
+        """Return recorded absences as ``(name, format, timestamp)`` tuples.
+
+        Only increments are absences; ``start`` and ``end`` are Unix
+        timestamps bounding ``[start, end)``. Needs a backend that keeps an
+        event history, i.e. ``"eventlog"``.
+        """
+
+        self.flush()
+        return [
+            (event["name"], event["format"], event["t"])
+            for event in self.backend.events(start, end)
+            if event["op"] == "delta"
+            and event["delta"] > 0
+            and (name is None or event["name"] == name)
+            and (format is None or event["format"] == format)
+        ]
+
+    def attendance_summary(self, threshold: int = 2) -> dict:
+        """Return attendance statistics over all courses.
+
+        See :func:`analytics.summarize`; ``threshold`` is the number of
+        unattended classes from which a course counts as at risk.
+        """
+
+        from analytics import CourseColumns, summarize
 
-    def create_database(self) -> None:
-        """Initialise the TinyDB database used to store courses."""
+        return summarize(CourseColumns.from_courses(self.courses), threshold)
+
+    def create_database(self, load: bool = True) -> None:
+        """Open the storage backend used to store courses."""
 
         if self.db_directory is not None:
             directory = self.db_directory
@@ -88,74 +479,519 @@ class CourseTracker:
 
         if not os.path.exists(directory):
             os.makedirs(directory)
-        self.database = os.path.join(directory, "course_database.json")
-        self.db = TinyDB(self.database)
-        self.load_courses()
+        backend_class, filename = BACKENDS[self.backend_name]
+        self.database = os.path.join(directory, filename)
+        self.backend: StorageBackend = backend_class(self.database)
+        self.closed = False
+        if load:
+            self.load_courses()
+
+    def enable_write_behind(
+        self,
+        debounce: float | None = DEFAULT_DEBOUNCE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """Persist single-course changes from a background writer thread.
+
+        Adds, removals and attendance changes are queued and coalesced
+        instead of written synchronously; see :class:`WriteBehindQueue`.
+        Call :meth:`close` (or :meth:`flush`) to make sure they reach disk.
+        With ``debounce=None`` there is no writer thread and changes are
+        held until :meth:`flush`, which persists them in a single write.
+        """
+
+        if self.write_queue is None:
+            self.write_queue = WriteBehindQueue(self.backend, debounce, batch_size)
+
+    def flush(self) -> None:
+        """Write any changes still waiting in the write-behind queue.
+
+        Inside a :meth:`transaction` changes wait for the commit instead.
+        """
+
+        if self.write_queue is not None and self._undo is None:
+            self.write_queue.flush()
+
+    def close(self) -> None:
+        """Flush pending writes and close the store. Safe to call twice.
+
+        If the final write fails its error is raised and the store is left
+        open with the changes still pending, so ``close`` can be retried or
+        the changes discarded with ``write_queue.discard()`` first.
+        """
+
+        if self.write_queue is not None:
+            self.write_queue.close()
+            self.write_queue = None
+        if not self.closed:
+            self.backend.close()
+            self.closed = True
+
+    def _save_course(self, course: Course, delta: int = 0) -> None:
+        """Write a single course record, inserting it if it is new.
+
+        A non-zero ``delta`` records the attendance change as an event.
+        """
+
+        events = [((course.name, course.format), delta, time.time())] if delta else []
+        if self.write_queue is not None:
+            self.write_queue.upsert(course, events)
+        else:
+            self.backend.write(upserts=[course], events=events)
+
+    def _insert_courses(self, courses: List[Course]) -> None:
+        """Append records for courses known not to be stored yet."""
+
+        if self._undo is not None:
+            for course in courses:
+                self.write_queue.upsert(course)
+            return
+        self.flush()
+        self.backend.insert(courses)
+
+    def _delete_course(self, name: str, format: str) -> None:
+        if self.write_queue is not None:
+            self.write_queue.delete((name, format))
+        else:
+            self.backend.write(deletes=[(name, format)])
 
     def save_courses(self) -> None:
-        self.db.truncate()
-        for course in sorted(self.courses, key=lambda x: (x.name, x.format)):
-            self.db.insert(
-                {
-                    "name": course.name,
-                    "format": course.format,
-                    "un_classes": course.un_classes,
-                }
-            )
+        """Rewrite the whole database from ``self.courses`` in one write."""
 
-    def load_courses(self):
-        self.courses = []
-        if not os.path.exists(self.database):
-            print(f"File {self.database} does not exist. Returning empty list")
+        if self._undo is not None:
+            self._rewrite = True
             return
+        self.flush()
+        self.backend.replace(map(self._index.__getitem__, self._keys))
 
+    def load_courses(self):
+        self.flush()
+        self.courses = []
         try:
-            self.db = TinyDB(self.database)
-            for course in self.db.all():
-                self.courses.append(
-                    Course(course["name"], course["format"], course["un_classes"])
-                )
+            self.courses = [Course(*record) for record in self.backend.load()]
         except Exception as e:
             print(f"Error loading courses: {e}")
 
-    def export_courses(self, filename: str) -> None:
-        """Export all courses to ``filename`` as CSV."""
+    def refresh(self) -> List[CourseKey]:
+        """Apply changes other processes made to the store since the last read.
 
-        fields = ["Nazwa", "Format", "Opuszczone"]
-        rows = [
-            [course.name, course.format, str(course.un_classes)]
-            for course in self.courses
-        ]
+        Pending writes are flushed first. Only courses whose stored state
+        differs from memory are touched; the rest keep their objects.
+        Returns the keys of added, updated and removed courses.
+        """
+
+        self.flush()
+        records = self.backend.refresh()
+        if records is None:
+            return []
+        changed: List[CourseKey] = []
+        added: Dict[CourseKey, Course] = {}
+        stored = set()
+        for name, format, un_classes in records:
+            key = (name, format)
+            stored.add(key)
+            course = self._index.get(key)
+            if course is None:
+                added[key] = Course(name, format, un_classes)
+            elif course.un_classes != un_classes:
+                course.un_classes = un_classes
+                changed.append(key)
+        if changed:
+            self._changed(membership=False)
+        removed = [key for key in self._index if key not in stored]
+        for key in removed:
+            self._unindex_course(key)
+        self._merge_courses(added)
+        return changed + list(added) + removed
 
-        with open(filename, "w", newline="") as csvfile:
-            csv.writer(csvfile).writerows([fields] + rows)
+    def export_courses(
+        self,
+        filename: str,
+        file_format: str | None = None,
+        compress: bool | None = None,
+        sort: str | None = None,
+    ) -> None:
+        """Export all courses to ``filename``.
 
-    def import_courses_replace(self, filename: str) -> None:
-        self._import_courses(filename, replace=True)
+        Courses are streamed straight to the file, so memory use stays flat
+        as the catalogue grows.
 
-    def import_courses_append(self, filename: str) -> None:
-        self._import_courses(filename, replace=False)
+        Parameters
+        ----------
+        filename:
+            Destination path, or ``"-"`` for standard output.
+        file_format:
+            ``"csv"`` or ``"jsonl"``. Guessed from the file name when omitted.
+        compress:
+            Gzip the output. Defaults to whether ``filename`` ends in ``.gz``.
+        sort:
+            ``None`` keeps insertion order, ``"name"`` orders by name and
+            format and ``"un_classes"`` by unattended classes, then name.
+        """
+
+        if file_format is None:
+            file_format = export_format_for(filename)
+        if file_format not in EXPORT_WRITERS:
+            raise ValueError(f"Unknown export format: {file_format}")
+        if compress is None:
+            compress = str(filename).lower().endswith(".gz")
+
+        if sort is None:
+            courses: Iterable[Course] = self._index.values()
+        elif sort == "name":
+            courses = map(self._index.__getitem__, self._keys)
+        elif sort == "un_classes":
+            courses = sorted(
+                self._index.values(), key=lambda x: (x.un_classes, x.name, x.format)
+            )
+        else:
+            raise ValueError(f"Unknown sort order: {sort}")
+
+        encoding = "utf-8" if file_format == "jsonl" else None
+        with open_export(filename, compress, encoding) as handle:
+            EXPORT_WRITERS[file_format](courses, handle)
+
+    def import_courses_replace(
+        self, filename: str, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ImportReport:
+        return self._import_courses(filename, replace=True, batch_size=batch_size)
+
+    def import_courses_append(
+        self, filename: str, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ImportReport:
+        return self._import_courses(filename, replace=False, batch_size=batch_size)
+
+    def _import_courses(
+        self, filename: str, replace: bool, batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ImportReport:
+        """Stream courses from a CSV file into the tracker.
+
+        Rows are read lazily. When appending they are handled ``batch_size``
+        at a time and every batch is persisted with a single write; when
+        replacing, the new collection is built first and then stored with a
+        single rewrite, and a file from which not a single course could be
+        read leaves the existing courses untouched. Malformed rows and
+        courses that already exist are recorded in the returned report
+        instead of aborting the import.
+        """
 
-    def _import_courses(self, filename: str, replace: bool) -> None:
+        report = ImportReport(str(filename))
         if not os.path.exists(filename):
             print(f"File {filename} does not exist.")
-            return
+            report.errors.append(RowError(0, "file does not exist"))
+            return report
 
-        try:
-            with open(filename, "r", newline="") as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Skip header
-                new_courses = [Course(row[0], row[1], int(row[2])) for row in reader]
+        if replace:
+            courses: Dict[CourseKey, Course] = {}
+            try:
+                for line, row in iter_csv_rows(filename):
+                    try:
+                        course = parse_course_row(row)
+                    except ValueError as e:
+                        report.errors.append(RowError(line, str(e)))
+                        continue
+                    key = (course.name, course.format)
+                    if key in courses:
+                        report.skipped += 1
+                    else:
+                        courses[key] = course
+            except (csv.Error, OSError, UnicodeDecodeError) as e:
+                print(f"Error importing courses from {filename}: {str(e)}")
+                report.errors.append(RowError(0, str(e)))
+            if not courses and not report.ok:
+                print(f"No courses read from {filename}, keeping existing ones.")
+                return report
+            self.courses = courses.values()
+            self.save_courses()
+            report.imported = len(courses)
+            return report
 
-            if replace:
-                self.courses = new_courses
-            else:
-                for course in new_courses:
-                    if course not in self.courses:
-                        self.courses.append(course)
+        try:
+            for batch in batched(iter_csv_rows(filename), batch_size):
+                added: Dict[CourseKey, Course] = {}
+                for line, row in batch:
+                    try:
+                        course = parse_course_row(row)
+                    except ValueError as e:
+                        report.errors.append(RowError(line, str(e)))
+                        continue
+                    key = (course.name, course.format)
+                    if key in self._index or key in added:
+                        report.skipped += 1
                     else:
-                        print(f"Course {course.name}, {course.format} already exists")
+                        added[key] = course
+                self._merge_courses(added)
+                self._insert_courses(list(added.values()))
+                report.imported += len(added)
+        except (csv.Error, OSError, UnicodeDecodeError) as e:
+            print(f"Error importing courses from {filename}: {str(e)}")
+            report.errors.append(RowError(0, str(e)))
+        return report
+
+    def import_courses_bulk(
+        self,
+        filenames: Iterable[str],
+        conflict: str = "skip",
+        replace: bool = False,
+        workers: int | None = None,
+    ) -> List[ImportReport]:
+        """Import many CSV files at once, parsing them in parallel.
+
+        Files are parsed in a process pool and merged in the order given,
+        then everything is persisted in a single write. Nothing is written
+        before all files have been read. Returns one :class:`ImportReport`
+        per file, in the order of ``filenames``.
 
+        Parameters
+        ----------
+        filenames:
+            CSV files to import.
+        conflict:
+            What to do with a course that already exists or appears again:
+            ``"skip"`` keeps the first occurrence, ``"overwrite"`` the last
+            one, and ``"sum"`` adds the unattended classes up, clamped to
+            the maximum of 3.
+        replace:
+            Replace all courses with the imported ones instead of merging.
+            Nothing is replaced if the files failed to yield a single course.
+        workers:
+            Worker processes, by default one per CPU.
+        """
+
+        if conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {conflict}")
+        filenames = [str(filename) for filename in filenames]
+        reports = [ImportReport(filename) for filename in filenames]
+        existing: Dict[CourseKey, Course] = {} if replace else self._index
+        merged: Dict[CourseKey, int] = {}
+        for report, parsed in zip(reports, read_csv_files(filenames, workers)):
+            names, formats, un_classes, errors = parsed
+            report.errors.extend(errors)
+            for key, un in zip(zip(names, formats), un_classes):
+                current = merged.get(key)
+                if current is None:
+                    course = existing.get(key)
+                    if course is None:
+                        merged[key] = un
+                        report.imported += 1
+                        continue
+                    current = course.un_classes
+                if conflict == "skip":
+                    report.skipped += 1
+                    continue
+                if conflict == "sum":
+                    un = min(current + un, 3)
+                merged[key] = un
+                report.imported += 1
+
+        if replace:
+            if not merged and not all(report.ok for report in reports):
+                print("No courses read from the files, keeping existing ones.")
+                return reports
+            self.courses = [Course(*key, un) for key, un in merged.items()]
             self.save_courses()
-        except (csv.Error, Exception) as e:
-            print(f"Error importing courses from {filename}: {str(e)}")
+            return reports
+
+        added: Dict[CourseKey, Course] = {}
+        changed = []
+        for key, un in merged.items():
+            course = self._index.get(key)
+            if course is None:
+                added[key] = Course(*key, un)
+            elif course.un_classes != un:
+                self._set_un_classes(course, un)
+                changed.append(course)
+        self._merge_courses(added)
+        if changed:
+            self._changed(membership=False)
+        if self._undo is not None:
+            self._insert_courses(changed + list(added.values()))
+            return reports
+        self.flush()
+        if added or changed:
+            self.backend.write(upserts=changed + list(added.values()))
+        return reports
+
+
+BATCH_COMMANDS = {"add": (2, 3), "remove": (2, 2), "inc": (2, 2), "dec": (2, 2)}
+
+
+def apply_batch(tracker: CourseTracker, lines: Iterable[str]) -> int:
+    """Apply batch operations to ``tracker`` and persist them in one write.
+
+    Each line holds one shell-quoted operation: ``add NAME FORMAT [N]``,
+    ``remove NAME FORMAT``, ``inc NAME FORMAT`` or ``dec NAME FORMAT``.
+    Blank lines and ``#`` comments are ignored. The batch runs in one
+    :meth:`CourseTracker.transaction`, so it is all or nothing: on the first
+    invalid operation nothing is written, the changes are rolled back and
+    ``ValueError`` names the offending line. Returns the number of
+    operations applied.
+    """
+
+    import shlex
+
+    applied = 0
+    with tracker.transaction():
+        for line_num, line in enumerate(lines, start=1):
+            try:
+                args = shlex.split(line, comments=True)
+                if not args:
+                    continue
+                command, args = args[0], args[1:]
+                if command not in BATCH_COMMANDS:
+                    raise ValueError(f"unknown command: {command}")
+                low, high = BATCH_COMMANDS[command]
+                if not low <= len(args) <= high:
+                    raise ValueError(f"{command}: wrong number of arguments")
+                if command == "add":
+                    tracker.add_course(*args[:2], *map(int, args[2:]))
+                elif command == "remove":
+                    tracker.get_course(*args)
+                    tracker.remove_course(*args)
+                elif command == "inc":
+                    tracker.increment_unattended(*args)
+                else:
+                    tracker.decrement_unattended(*args)
+            except ValueError as e:
+                raise ValueError(f"line {line_num}: {e}") from None
+            applied += 1
+    return applied
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Command-line interface: ``python -m course_tracker COMMAND ...``."""
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="course_tracker", description="Track unattended classes per course."
+    )
+    parser.add_argument("--db-directory", help="directory holding the database")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="tinydb")
+    parser.add_argument(
+        "--stats", metavar="PATH", help='write operation stats as JSON, "-" for stderr'
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="OPERATION",
+        help="run an operation such as CourseTracker.load_courses under cProfile",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def course_command(name: str, help: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help)
+        command.add_argument("name")
+        command.add_argument("format")
+        return command
+
+    course_command("add", "add a course").add_argument(
+        "un_classes", type=int, nargs="?", default=0
+    )
+    course_command("remove", "remove a course")
+    course_command("inc", "record an unattended class")
+    course_command("dec", "take back an unattended class")
+    commands.add_parser("list", help="list courses as tab-separated values")
+    import_command = commands.add_parser("import", help="import courses from CSV")
+    import_command.add_argument("files", nargs="+", metavar="file")
+    import_command.add_argument(
+        "--replace", action="store_true", help="replace all courses"
+    )
+    import_command.add_argument(
+        "--conflict",
+        choices=CONFLICT_POLICIES,
+        help="resolve repeated courses; several files are imported in parallel",
+    )
+    import_command.add_argument("--workers", type=int, help="parallel parsers")
+    export_command = commands.add_parser("export", help="export courses")
+    export_command.add_argument("file", help='destination, "-" for stdout')
+    export_command.add_argument("--format", choices=sorted(EXPORT_WRITERS))
+    export_command.add_argument("--gzip", action="store_true", default=None)
+    export_command.add_argument("--sort", choices=("name", "un_classes"))
+    stats_command = commands.add_parser("stats", help="attendance report")
+    stats_command.add_argument("--threshold", type=int, default=2)
+    stats_command.add_argument("--json", action="store_true", help="print JSON")
+    batch_command = commands.add_parser(
+        "batch", help="apply operations from a file in one transaction"
+    )
+    batch_command.add_argument(
+        "file", nargs="?", default="-", help='operations, "-" for stdin (default)'
+    )
+    args = parser.parse_args(argv)
+
+    from instrumentation import configure
+
+    configure(args.stats, args.profile, classes=[CourseTracker])
+    try:
+        tracker = CourseTracker(db_directory=args.db_directory, backend=args.backend)
+    except OSError as e:
+        print(f"course_tracker {args.command}: {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.command == "add":
+            tracker.add_course(args.name, args.format, args.un_classes)
+        elif args.command == "remove":
+            tracker.get_course(args.name, args.format)
+            tracker.remove_course(args.name, args.format)
+        elif args.command in ("inc", "dec"):
+            if args.command == "inc":
+                tracker.increment_unattended(args.name, args.format)
+            else:
+                tracker.decrement_unattended(args.name, args.format)
+            print(tracker.get_course(args.name, args.format).un_classes)
+        elif args.command == "list":
+            sys.stdout.writelines(
+                f"{course.name}\t{course.format}\t{course.un_classes}\n"
+                for course in tracker.courses
+            )
+        elif args.command == "import":
+            if len(args.files) == 1 and args.conflict is None and not args.workers:
+                if args.replace:
+                    reports = [tracker.import_courses_replace(args.files[0])]
+                else:
+                    reports = [tracker.import_courses_append(args.files[0])]
+            else:
+                reports = tracker.import_courses_bulk(
+                    args.files, args.conflict or "skip", args.replace, args.workers
+                )
+            for report in reports:
+                for error in report.errors:
+                    print(f"{report.filename}: {error}", file=sys.stderr)
+                if len(reports) > 1:
+                    print(
+                        f"{report.filename}: {report.rows} rows, imported "
+                        f"{report.imported}, skipped {report.skipped}"
+                    )
+            imported = sum(report.imported for report in reports)
+            skipped = sum(report.skipped for report in reports)
+            print(f"Imported {imported} courses, skipped {skipped}")
+            return 0 if all(report.ok for report in reports) else 1
+        elif args.command == "export":
+            tracker.export_courses(args.file, args.format, args.gzip, args.sort)
+        elif args.command == "stats":
+            from analytics import format_report
+
+            summary = tracker.attendance_summary(args.threshold)
+            if args.json:
+                import json
+
+                json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+                print()
+            else:
+                print(format_report(summary))
+        elif args.command == "batch":
+            if args.file == "-":
+                applied = apply_batch(tracker, sys.stdin)
+            else:
+                with open(args.file, encoding="utf-8") as handle:
+                    applied = apply_batch(tracker, handle)
+            print(f"Applied {applied} operations")
+    except (ValueError, OSError) as e:
+        print(f"course_tracker {args.command}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        tracker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,50 @@
+import os
 import platform
+import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-
-import darkdetect  # type: ignore
+from tkinter import messagebox, ttk
 
+from course import ATTENDANCE_TAGS, FORMATS
 from course_tracker import CourseTracker
+from search_index import CourseListing
+from virtual_list import VirtualCourseList
+
+# Courses are inserted into the Treeview in pages of this size, yielding to
+# the event loop in between so the window stays responsive while loading.
+LOAD_PAGE_SIZE = 500
+LOAD_POLL_MS = 10
+# Above this many courses the list switches to virtual scrolling.
+VIRTUAL_THRESHOLD = 10_000
+# How often to look for changes other programs made to the database.
+EXTERNAL_POLL_MS = 2000
 
 
 class CourseTrackerGUI:
-    def __init__(self, master):
+    def __init__(self, master, tracker=None, virtual=None):
+        """Build the main window.
+
+        The window is drawn first and the courses are loaded afterwards in a
+        background thread. A ``tracker`` passed in should therefore be
+        created with ``load=False``. ``virtual`` forces virtual scrolling on
+        or off; by default it is used once there are ``VIRTUAL_THRESHOLD``
+        courses.
+        """
+
         self.master = master
         self.master.title("Śledzenie obecności na kursach")
-        self.tracker = CourseTracker()
+        self.tracker = tracker if tracker is not None else CourseTracker(load=False)
+        # Rapid +/- presses are coalesced and written off the Tk main thread.
+        self.tracker.enable_write_behind()
         self.selected_item = None
+        self.loading = True
+        self.virtual = virtual
+        self.virtual_list = None
+        # The courses on show: the tracker itself, or the search results.
+        self.listing = self.tracker
+        # Treeview bookkeeping, so refreshes touch only the rows that changed.
+        self.tree_items = {}  # (name, format) -> item id
+        self.item_keys = {}  # item id -> (name, format)
+        self.tree_values = {}  # (name, format) -> displayed un_classes
 
         self.master.geometry("750x400")
         self.master.minsize(700, 370)
@@ -23,6 +55,8 @@ class CourseTrackerGUI:
         self.bind_shortcuts()
         self.center_window()
         self.setup_gui()
+        self.master.protocol("WM_DELETE_WINDOW", self.quit)
+        self.master.after_idle(self.start_loading)
 
     def setup_menu(self):
         menu_bar = tk.Menu(self.master)
@@ -39,7 +73,7 @@ class CourseTrackerGUI:
             label="Close", accelerator="Cmd+W", command=self.close_window
         )
         file_menu.add_command(
-            label="Exit", accelerator="Cmd+Q", command=self.master.quit
+            label="Exit", accelerator="Cmd+Q", command=self.quit
         )
 
     def setup_gui(self):
@@ -58,7 +92,7 @@ class CourseTrackerGUI:
             row=0, column=2, padx=5, pady=5, sticky="e"
         )
 
-        self.categories = ["Audytorium", "Wykład", "Laboratorium"]
+        self.categories = list(FORMATS)
         self.category_var = tk.StringVar()
         self.category_dropdown = ttk.Combobox(
             add_frame,
@@ -67,23 +101,33 @@ class CourseTrackerGUI:
             state="readonly",
         )
         self.category_dropdown.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
-        self.category_dropdown.set("Audytorium")
+        self.category_dropdown.set(FORMATS[0])
 
-        ttk.Button(add_frame, text="Dodaj", command=self.add_course).grid(
-            row=0, column=4, padx=5, pady=5, sticky="w"
+        self.add_button = ttk.Button(
+            add_frame, text="Dodaj", command=self.add_course, state="disabled"
         )
+        self.add_button.grid(row=0, column=4, padx=5, pady=5, sticky="w")
 
         list_frame = ttk.LabelFrame(self.master, text="Lista kursów")
         list_frame.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
         list_frame.columnconfigure(0, weight=1)
-        list_frame.rowconfigure(0, weight=1)
+        list_frame.rowconfigure(1, weight=1)
+
+        search_frame = ttk.Frame(list_frame)
+        search_frame.grid(row=0, column=0, columnspan=4, pady=(0, 5), sticky="ew")
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="Szukaj:").grid(row=0, column=0, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search)
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.grid(row=0, column=1, padx=5, sticky="ew")
 
         self.courses_tree = ttk.Treeview(
             list_frame,
             columns=("Name", "Format", "Unattended Classes"),
             show="headings",
         )
-        self.courses_tree.grid(row=0, column=0, columnspan=3, sticky="nsew")
+        self.courses_tree.grid(row=1, column=0, columnspan=3, sticky="nsew")
 
         self.courses_tree.heading("Name", text="Kurs")
         self.courses_tree.heading("Format", text="Format")
@@ -93,19 +137,17 @@ class CourseTrackerGUI:
         self.courses_tree.column("Format", width=150, stretch=tk.YES)
         self.courses_tree.column("Unattended Classes", width=100, stretch=tk.YES)
 
-        scrollbar = ttk.Scrollbar(
+        self.scrollbar = ttk.Scrollbar(
             list_frame, orient="vertical", command=self.courses_tree.yview
         )
-        scrollbar.grid(row=0, column=3, sticky="ns")
-        self.courses_tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar.grid(row=1, column=3, sticky="ns")
+        self.courses_tree.configure(yscrollcommand=self.scrollbar.set)
 
         self.courses_tree.bind("<<TreeviewSelect>>", self.on_tree_select)
         self.courses_tree.bind("<Button-1>", self.on_tree_click)
 
-        self.setup_treeview_tags()
-
         button_frame = ttk.Frame(list_frame)
-        button_frame.grid(row=1, column=0, columnspan=3, padx=100, pady=5, sticky="ew")
+        button_frame.grid(row=2, column=0, columnspan=3, padx=100, pady=5, sticky="ew")
         button_frame.grid_columnconfigure((0, 1, 2), weight=1)
 
         self.delete_button = ttk.Button(
@@ -135,7 +177,111 @@ class CourseTrackerGUI:
         )
         self.decrement_button.grid(row=0, column=0, padx=0, pady=0)
 
-        self.list_courses()
+    def start_loading(self):
+        """Load the courses once the first frame has been drawn."""
+
+        self.setup_treeview_tags()
+        self.loader = threading.Thread(target=self.tracker.load_courses, daemon=True)
+        self.loader.start()
+        self.master.after(LOAD_POLL_MS, self.poll_loading)
+
+    def poll_loading(self):
+        if self.loader.is_alive():
+            self.master.after(LOAD_POLL_MS, self.poll_loading)
+        elif self.use_virtual_list():
+            self.enable_virtual_list()
+            self.finish_loading()
+        else:
+            self.insert_page(self.tracker.list_courses(), 0)
+
+    def insert_page(self, courses, start):
+        for course in courses[start : start + LOAD_PAGE_SIZE]:
+            self.insert_course_row(course)
+        if start + LOAD_PAGE_SIZE < len(courses):
+            self.master.after(1, self.insert_page, courses, start + LOAD_PAGE_SIZE)
+        else:
+            self.finish_loading()
+
+    def finish_loading(self):
+        self.loading = False
+        self.add_button.config(state="normal")
+        if self.search_var.get().strip():
+            self.list_courses()
+        self.master.after(EXTERNAL_POLL_MS, self.poll_external_changes)
+
+    def poll_external_changes(self):
+        """Show changes another window or script made to the database.
+
+        Skipped while this window's own edits are being written: refreshing
+        would first wait for that write on the UI thread. The next poll
+        catches up.
+        """
+
+        queue = self.tracker.write_queue
+        if queue is not None and not queue.idle():
+            self.master.after(EXTERNAL_POLL_MS, self.poll_external_changes)
+            return
+        try:
+            changed = self.tracker.refresh()
+        except Exception as e:
+            print(f"Error refreshing courses: {e}")
+            changed = []
+        if changed:
+            self.list_courses()
+        self.master.after(EXTERNAL_POLL_MS, self.poll_external_changes)
+
+    def use_virtual_list(self):
+        if self.virtual is not None:
+            return self.virtual
+        return len(self.tracker) >= VIRTUAL_THRESHOLD
+
+    def enable_virtual_list(self):
+        """Switch the Treeview to virtual scrolling for the rest of the session."""
+
+        select_key = self.selected_key()
+        self.tree_items.clear()
+        self.item_keys.clear()
+        self.tree_values.clear()
+        self.selected_item = None
+        self.virtual_list = VirtualCourseList(
+            self.courses_tree, self.scrollbar, self.listing, self.get_attendance_tag
+        )
+        self.virtual_list.refresh(select_key)
+
+    def insert_course_row(self, course, index="end"):
+        key = (course.name, course.format)
+        item = self.courses_tree.insert(
+            "",
+            index,
+            values=(course.name, course.format, course.un_classes),
+            tags=(self.get_attendance_tag(course.un_classes),),
+        )
+        self.tree_items[key] = item
+        self.item_keys[item] = key
+        self.tree_values[key] = course.un_classes
+        return item
+
+    def update_course_row(self, item, course):
+        self.courses_tree.item(
+            item,
+            values=(course.name, course.format, course.un_classes),
+            tags=(self.get_attendance_tag(course.un_classes),),
+        )
+        self.tree_values[(course.name, course.format)] = course.un_classes
+
+    def delete_course_row(self, key):
+        item = self.tree_items.pop(key)
+        del self.item_keys[item]
+        del self.tree_values[key]
+        self.courses_tree.delete(item)
+        if item == self.selected_item:
+            self.selected_item = None
+            self.update_button_states()
+
+    def selected_key(self):
+        if self.virtual_list is not None:
+            return self.virtual_list.selected_key()
+        return self.item_keys.get(self.selected_item)
 
     def add_course(self):
         course_name = self.course_name_entry.get()
@@ -150,71 +296,117 @@ class CourseTrackerGUI:
         else:
             messagebox.showerror("Error", "Proszę wprowadzić nazwę kursu.")
 
-    def list_courses(self, select_item=None):
-        if not select_item and self.selected_item:
-            current_values = self.courses_tree.item(self.selected_item, "values")
-            select_item = (current_values[0], current_values[1])
-
-        self.courses_tree.delete(*self.courses_tree.get_children())
-
-        for course in self.tracker.list_courses():
-            tag = self.get_attendance_tag(course.un_classes)
-            item = self.courses_tree.insert(
-                "",
-                "end",
-                values=(course.name, course.format, course.un_classes),
-                tags=(tag,),
-            )
-            if select_item and (course.name, course.format) == select_item:
-                self.selected_item = item
+    def current_listing(self):
+        """The tracker, or the courses matching the search box."""
+
+        query = self.search_var.get().strip()
+        if not query:
+            return self.tracker
+        return CourseListing(self.tracker.search(query))
+
+    def on_search(self, *args):
+        if not self.loading:
+            self.list_courses()
 
+    def list_courses(self, select_item=None):
+        """Bring the Treeview in line with the tracker and the search box.
+
+        Only rows that were added, removed or changed are touched; the rest,
+        including the selection, stay as they are.
+        """
+
+        self.listing = self.current_listing()
+        if self.virtual_list is None and self.use_virtual_list():
+            self.enable_virtual_list()
+        if self.virtual_list is not None:
+            self.virtual_list.tracker = self.listing
+            self.virtual_list.refresh(select_item or self.selected_key())
+            self.update_button_states()
+            return
+
+        courses = self.listing.list_courses()
+        current = {(course.name, course.format) for course in courses}
+        for key in [key for key in self.tree_items if key not in current]:
+            self.delete_course_row(key)
+
+        # Courses come sorted and surviving rows keep their relative order,
+        # so each new row goes in at its position in the listing.
+        for index, course in enumerate(courses):
+            key = (course.name, course.format)
+            item = self.tree_items.get(key)
+            if item is None:
+                self.insert_course_row(course, index)
+            elif self.tree_values[key] != course.un_classes:
+                self.update_course_row(item, course)
+
+        if select_item in self.tree_items:
+            self.selected_item = self.tree_items[select_item]
         if self.selected_item:
             self.courses_tree.selection_set(self.selected_item)
             self.courses_tree.see(self.selected_item)
 
+    def refresh_course(self, key):
+        """Redraw the row of a single course after its attendance changed."""
+
+        if self.virtual_list is not None:
+            self.virtual_list.render()
+            return
+        course = self.tracker.get_course(*key)
+        if self.tree_values[key] != course.un_classes:
+            self.update_course_row(self.tree_items[key], course)
+
     def delete_course(self):
-        if self.selected_item:
-            values = self.courses_tree.item(self.selected_item, "values")
-            course_name, course_format = values[0], values[1]
+        key = self.selected_key()
+        if key:
+            course_name, course_format = key
             if messagebox.askyesno(
                 "Potwierdzenie usunięcia",
                 f"Czy na pewno chcesz usunąć {course_name}?",
             ):
                 try:
                     self.tracker.remove_course(course_name, course_format)
-                    self.courses_tree.delete(self.selected_item)
-                    self.selected_item = None
-                    self.update_button_states()
+                    self.listing = self.current_listing()
+                    if self.virtual_list is not None:
+                        self.virtual_list.tracker = self.listing
+                        self.virtual_list.refresh()
+                        self.update_button_states()
+                    else:
+                        self.delete_course_row(key)
                 except Exception as e:
                     messagebox.showerror(
                         "Error", f"Nie udało się usunąć kursu: {str(e)}"
                     )
 
     def increment_unattended(self):
-        if self.selected_item:
-            values = self.courses_tree.item(self.selected_item, "values")
-            course_name, course_format = values[0], values[1]
-            self.tracker.increment_unattended(course_name, course_format)
-            self.list_courses((course_name, course_format))
+        key = self.selected_key()
+        if key:
+            self.tracker.increment_unattended(*key)
+            self.refresh_course(key)
             self.courses_tree.focus_set()
 
     def decrement_unattended(self):
-        if self.selected_item:
-            values = self.courses_tree.item(self.selected_item, "values")
-            course_name, course_format = values[0], values[1]
-            self.tracker.decrement_unattended(course_name, course_format)
-            self.list_courses((course_name, course_format))
+        key = self.selected_key()
+        if key:
+            self.tracker.decrement_unattended(*key)
+            self.refresh_course(key)
             self.courses_tree.focus_set()
 
     def update_button_states(self):
-        state = "normal" if self.selected_item else "disabled"
+        state = "normal" if self.selected_key() else "disabled"
         self.delete_button.config(state=state)
         self.increment_button.config(state=state)
         self.decrement_button.config(state=state)
 
     def on_tree_select(self, event):
         selected_items = self.courses_tree.selection()
-        self.selected_item = selected_items[0] if selected_items else None
+        if self.virtual_list is not None:
+            # Rows scrolled out of view lose their Treeview selection, so only
+            # explicit deselection (deselect_item) clears the virtual one.
+            if selected_items:
+                index = self.virtual_list.index_of_item(selected_items[0])
+                self.virtual_list.selected = index
+        else:
+            self.selected_item = selected_items[0] if selected_items else None
         self.update_button_states()
 
     def on_tree_click(self, event):
@@ -224,23 +416,45 @@ class CourseTrackerGUI:
     def deselect_item(self, event=None):
         self.courses_tree.selection_remove(self.courses_tree.selection())
         self.selected_item = None
+        if self.virtual_list is not None:
+            self.virtual_list.selected = None
         self.update_button_states()
         self.courses_tree.focus_set()
 
     def move_selection(self, direction):
-        if self.selected_item:
-            items = self.courses_tree.get_children()
-            current_index = items.index(self.selected_item)
-            new_index = (current_index + direction) % len(items)
-            new_item = items[new_index]
+        key = self.selected_key()
+        # While pages are still being inserted the neighbour may have no row.
+        if not key or self.loading:
+            return
+        if self.virtual_list is not None:
+            position = self.virtual_list.selected
+        else:
+            position = self.listing.course_position(*key)
+        new_index = (position + direction) % len(self.listing)
+
+        if self.virtual_list is not None:
+            self.virtual_list.select_index(new_index)
+        else:
+            course = self.listing.course_at(new_index)
+            new_item = self.tree_items[(course.name, course.format)]
             self.courses_tree.selection_set(new_item)
             self.courses_tree.see(new_item)
             self.selected_item = new_item
-            self.update_button_states()
+        self.update_button_states()
+
+    def typing(self):
+        """Whether the keyboard focus is in a text field, e.g. the search box."""
+
+        return isinstance(self.master.focus_get(), tk.Entry)
 
     def bind_shortcuts(self):
-        self.master.bind("<Left>", lambda event: self.decrement_unattended())
-        self.master.bind("<Right>", lambda event: self.increment_unattended())
+        # Keys that also edit text are left to the field being typed in.
+        self.master.bind(
+            "<Left>", lambda event: self.typing() or self.decrement_unattended()
+        )
+        self.master.bind(
+            "<Right>", lambda event: self.typing() or self.increment_unattended()
+        )
         self.master.bind("<Up>", lambda event: self.move_selection(-1))
         self.master.bind("<Down>", lambda event: self.move_selection(1))
         self.master.bind("<Escape>", self.deselect_item)
@@ -249,12 +463,16 @@ class CourseTrackerGUI:
             self.master.bind("<Command-o>", self.import_file)
             self.master.bind("<Command-s>", self.export_file)
             self.master.bind("<Command-w>", self.close_window)
-            self.master.bind("<Command-q>", lambda event: self.master.quit())
-            self.master.bind("<BackSpace>", lambda event: self.delete_course())
+            self.master.bind("<Command-q>", lambda event: self.quit())
+            self.master.bind(
+                "<BackSpace>", lambda event: self.typing() or self.delete_course()
+            )
         else:  # Windows and Linux
             self.master.bind("<Control-o>", self.import_file)
             self.master.bind("<Control-s>", self.export_file)
-            self.master.bind("<Delete>", lambda event: self.delete_course())
+            self.master.bind(
+                "<Delete>", lambda event: self.typing() or self.delete_course()
+            )
 
     def center_window(self):
         self.master.update_idletasks()
@@ -265,6 +483,8 @@ class CourseTrackerGUI:
         self.master.geometry(f"+{x}+{y}")
 
     def setup_treeview_tags(self):
+        import darkdetect  # type: ignore
+
         if darkdetect.isLight():
             self.courses_tree.tag_configure("green", background="#90EE90")
             self.courses_tree.tag_configure("yellow", background="#faf86e")
@@ -285,13 +505,17 @@ class CourseTrackerGUI:
             )
 
     def get_attendance_tag(self, un_classes):
-        return ["green", "yellow", "orange", "red"][min(un_classes, 3)]
+        return ATTENDANCE_TAGS[min(un_classes, 3)]
 
     def import_file(self, event=None):
-        file_path = filedialog.askopenfilename(
+        from tkinter import filedialog
+
+        if self.loading:
+            return
+        file_paths = filedialog.askopenfilenames(
             filetypes=[("Pliki tekstowe", "*.csv"), ("Wszystkie pliki", "*.*")]
         )
-        if file_path:
+        if file_paths:
             response = messagebox.askyesnocancel(
                 "Opcje importu",
                 "Czy chcesz zastąpić istniejącą konfigurację?\n\n"
@@ -300,13 +524,40 @@ class CourseTrackerGUI:
                 "Anuluj: Przerwij import",
             )
             if response is not None:
-                if response:
-                    self.tracker.import_courses_replace(file_path)
-                else:
-                    self.tracker.import_courses_append(file_path)
+                try:
+                    # An import that raises is rolled back, in memory and on
+                    # disk. Bad rows and files do not raise; they end up in
+                    # the reports shown below.
+                    with self.tracker.transaction():
+                        reports = self.import_files(file_paths, response)
+                except Exception as e:
+                    self.list_courses()
+                    messagebox.showerror(
+                        "Error", f"Nie udało się zaimportować kursów: {str(e)}"
+                    )
+                    return
                 self.list_courses()
+                errors = [
+                    f"{os.path.basename(report.filename)}: {error}"
+                    if len(reports) > 1
+                    else str(error)
+                    for report in reports
+                    for error in report.errors
+                ]
+                if errors:
+                    details = "\n".join(errors[:10])
+                    imported = sum(report.imported for report in reports)
+                    messagebox.showwarning(
+                        "Import",
+                        f"Zaimportowano kursów: {imported}.\n"
+                        f"Pominięte wiersze: {len(errors)}\n\n{details}",
+                    )
 
     def export_file(self, event=None):
+        from tkinter import filedialog
+
+        if self.loading:
+            return
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("Pliki CSV", "*.csv"), ("Wszystkie pliki", "*.*")],
@@ -316,18 +567,69 @@ class CourseTrackerGUI:
 
     def close_window(self, event=None):
         if messagebox.askokcancel("Exit", "Czy chcesz zakończyć program?"):
-            self.master.quit()
+            self.quit()
+
+    def quit(self):
+        """Flush pending writes and leave the main loop.
+
+        If they cannot be written, ask before quitting and losing them.
+        """
+
+        try:
+            self.tracker.close()
+        except Exception as e:
+            if not messagebox.askyesno(
+                "Błąd zapisu",
+                f"Nie udało się zapisać zmian: {str(e)}\n\n"
+                "Zamknąć mimo to? Niezapisane zmiany zostaną utracone.",
+                icon=messagebox.WARNING,
+            ):
+                return
+            self.tracker.write_queue.discard()
+            self.tracker.close()
+        self.master.quit()
+
+    def import_files(self, file_paths, replace):
+        if len(file_paths) > 1:
+            # Several files are parsed in parallel and saved at once.
+            return self.tracker.import_courses_bulk(file_paths, replace=replace)
+        if replace:
+            return [self.tracker.import_courses_replace(file_paths[0])]
+        return [self.tracker.import_courses_append(file_paths[0])]
 
     def reset_data(self):
+        if self.loading:
+            return
         if messagebox.askokcancel(
             "Resetuj dane",
             "Czy na pewno chcesz zresetować dane? Ta operacja jest nieodwracalna!",
         ):
-            self.tracker.reset_data()
+            try:
+                with self.tracker.transaction():
+                    self.tracker.reset_data()
+            except Exception as e:
+                messagebox.showerror(
+                    "Error", f"Nie udało się zresetować danych: {str(e)}"
+                )
             self.list_courses()
 
 
 if __name__ == "__main__":
+    from instrumentation import configure
+
+    configure(classes=[CourseTracker, CourseTrackerGUI])
     root = tk.Tk()
-    app = CourseTrackerGUI(root)
-    root.mainloop()
+    try:
+        app = CourseTrackerGUI(root)
+    except OSError as e:
+        # E.g. an event log another window or script is writing.
+        root.withdraw()
+        messagebox.showerror(
+            "Error", f"Nie udało się otworzyć bazy kursów: {str(e)}"
+        )
+        root.destroy()
+        raise SystemExit(1)
+    try:
+        root.mainloop()
+    finally:
+        app.tracker.close()
@@ -0,0 +1,128 @@
+"""An advisory lock file shared by processes working on one database."""
+
+import os
+import threading
+
+if os.name == "nt":
+    import msvcrt
+
+    # Windows locks are mandatory, so lock a byte past the version number
+    # to keep it readable by processes waiting for the lock.
+    LOCK_OFFSET = 1 << 20
+
+    def _lock(handle, blocking: bool = True) -> bool:
+        handle.seek(LOCK_OFFSET)
+        while True:
+            try:
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                msvcrt.locking(handle.fileno(), mode, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                continue  # LK_LOCK gives up after ten seconds; keep waiting
+
+    def _unlock(handle) -> None:
+        handle.seek(LOCK_OFFSET)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(handle, blocking: bool = True) -> bool:
+        try:
+            fcntl.flock(
+                handle.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+            )
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(handle) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """An exclusive lock on ``path`` across processes and threads.
+
+    The lock is re-entrant within a thread. The lock file also holds a
+    version number, which writers bump after every change to the guarded
+    data; readers compare it with the version they last saw to detect
+    changes made by other processes without reading the data itself.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._handle = None
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                if self._handle is None:
+                    self._handle = open(self.path, "a+b")
+                _lock(self._handle)
+            self._depth += 1
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def hold(self) -> bool:
+        """Keep the lock until :meth:`close`, without waiting for it.
+
+        Unlike :meth:`acquire` this is not tied to the calling thread. Returns
+        ``False`` if another process holds the lock.
+        """
+
+        with self._thread_lock:
+            if self._handle is None:
+                self._handle = open(self.path, "a+b")
+            if self._depth == 0 and not _lock(self._handle, blocking=False):
+                return False
+            self._depth += 1
+            return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            _unlock(self._handle)
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def read_version(self) -> int | None:
+        """Return the stored version, or ``None`` if it cannot be read now."""
+
+        try:
+            with open(self.path, "rb") as handle:
+                return int(handle.read(32) or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            return None  # Mid-update by another process.
+
+    def bump_version(self) -> int:
+        """Increment the stored version. Call with the lock held."""
+
+        version = (self.read_version() or 0) + 1
+        self._handle.seek(0)
+        self._handle.truncate()
+        self._handle.write(str(version).encode("ascii"))
+        self._handle.flush()
+        return version
+
+    def close(self) -> None:
+        """Close the lock file, which also drops a lock taken by :meth:`hold`."""
+
+        with self._thread_lock:
+            self._depth = 0
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
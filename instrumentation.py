@@ -0,0 +1,275 @@
+"""Opt-in timing of tracker, storage and GUI operations.
+
+Instrumentation is off unless ``COURSE_TRACKER_STATS`` is set (or the
+command line passes ``--stats``): the methods listed in :data:`OPERATIONS`
+are then wrapped so every call records its latency, and storage calls the
+bytes they wrote. The numbers are written as JSON at exit, to the path in
+the variable or to standard error for ``-``. While disabled nothing is
+wrapped, so the cost is exactly zero.
+
+``COURSE_TRACKER_PROFILE`` (or ``--profile``) names one operation, e.g.
+``CourseTracker.load_courses``, to run under :mod:`cProfile`. The profile
+is printed to standard error at exit and saved to ``<operation>.prof``.
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+STATS_ENV = "COURSE_TRACKER_STATS"
+PROFILE_ENV = "COURSE_TRACKER_PROFILE"
+# Upper bounds of the latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS_MS = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000)
+PROFILE_LINES = 25
+
+OPERATIONS: Dict[str, Tuple[str, ...]] = {
+    "CourseTracker": (
+        "load_courses",
+        "save_courses",
+        "refresh",
+        "flush",
+        "add_course",
+        "remove_course",
+        "increment_unattended",
+        "decrement_unattended",
+        "add_courses",
+        "remove_courses",
+        "apply_deltas",
+        "list_courses",
+        "list_courses_str",
+        "courses_by_format",
+        "search",
+        "attendance_summary",
+        "import_courses_append",
+        "import_courses_replace",
+        "import_courses_bulk",
+        "export_courses",
+    ),
+    "CourseTrackerGUI": (
+        "insert_page",
+        "list_courses",
+        "refresh_course",
+        "delete_course",
+        "poll_external_changes",
+        "import_file",
+        "export_file",
+        "reset_data",
+    ),
+    "StorageBackend": ("insert", "clear"),
+    "TinyDBBackend": ("load", "refresh", "write", "replace"),
+    "SQLiteBackend": ("load", "refresh", "write", "insert", "replace"),
+    "EventLogBackend": ("load", "write", "replace", "compact"),
+}
+
+
+class OperationStats:
+    """Call count, latency histogram and bytes written of one operation."""
+
+    def __init__(self, counts_bytes: bool) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.bytes_written = 0 if counts_bytes else None
+
+    def record(self, seconds: float, written: int = 0) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        if self.bytes_written is not None:
+            self.bytes_written += written
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}")
+        stats = {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max * 1000, 3),
+            "histogram_ms": dict(zip(labels, self.buckets)),
+        }
+        if self.bytes_written is not None:
+            stats["bytes_written"] = self.bytes_written
+        return stats
+
+
+class Instrumentation:
+    """Per-operation stats, keyed by ``"<class>.<method>"``."""
+
+    def __init__(self, profile: str | None = None) -> None:
+        self.operations: Dict[str, OperationStats] = {}
+        self.profile = profile
+        self.profiler = None
+        if profile is not None:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+        self._profiling = False
+        self._lock = threading.Lock()
+        self._patched: List[Tuple[type, str, Callable]] = []
+
+    def record(self, name: str, seconds: float, written: int | None = None) -> None:
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats(written is not None)
+            stats.record(seconds, written or 0)
+
+    def _start_profile(self) -> bool:
+        with self._lock:
+            if self._profiling:
+                return False  # Already profiling an outer or concurrent call.
+            self._profiling = True
+        self.profiler.enable()
+        return True
+
+    def _stop_profile(self) -> None:
+        self.profiler.disable()
+        self._profiling = False
+
+    def wrap(
+        self,
+        name: str,
+        function: Callable,
+        written: Optional[Callable[[object], int]] = None,
+    ) -> Callable:
+        """Return ``function`` timed as operation ``name``.
+
+        ``written`` maps the instance to a running count of bytes written,
+        sampled before and after each call.
+        """
+
+        profiled = name == self.profile
+
+        @functools.wraps(function)
+        def instrumented(self_, *args, **kwargs):
+            before = written(self_) if written is not None else 0
+            profiling = profiled and self._start_profile()
+            start = time.perf_counter()
+            try:
+                return function(self_, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if profiling:
+                    self._stop_profile()
+                if written is None:
+                    self.record(name, elapsed)
+                else:
+                    self.record(name, elapsed, written(self_) - before)
+
+        return instrumented
+
+    def instrument(
+        self, cls: type, written: Optional[Callable[[object], int]] = None
+    ) -> None:
+        """Wrap the methods :data:`OPERATIONS` lists for ``cls``."""
+
+        for method in OPERATIONS.get(cls.__name__, ()):
+            original = cls.__dict__[method]
+            name = f"{cls.__name__}.{method}"
+            setattr(cls, method, self.wrap(name, original, written))
+            self._patched.append((cls, method, original))
+
+    def uninstall(self) -> None:
+        """Restore the original methods."""
+
+        for cls, method, original in reversed(self._patched):
+            setattr(cls, method, original)
+        self._patched = []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: self.operations[name].as_dict()
+                for name in sorted(self.operations)
+            }
+
+    def dump(self, path: str) -> None:
+        """Write :meth:`stats` as JSON to ``path``, ``"-"`` for standard error."""
+
+        text = json.dumps({"operations": self.stats()}, indent=2)
+        if path == "-":
+            print(text, file=sys.stderr)
+        else:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text + "\n")
+
+    def dump_profile(self) -> None:
+        """Print the profile of :attr:`profile` and save it for other tools."""
+
+        import pstats
+
+        if self.profiler is None or not self.profiler.getstats():
+            return
+        filename = f"{self.profile}.prof"
+        self.profiler.dump_stats(filename)
+        print(f"Profile of {self.profile} saved to {filename}", file=sys.stderr)
+        stats = pstats.Stats(self.profiler, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+
+
+_active: Instrumentation | None = None
+
+
+def enable(
+    path: str | None = None, profile: str | None = None, classes: Iterable[type] = ()
+) -> Instrumentation:
+    """Instrument the storage backends and ``classes``; dump at exit.
+
+    ``path`` receives the JSON stats, ``profile`` names the operation to
+    profile. Enabling twice returns the active instance unchanged.
+    """
+
+    global _active
+    if _active is not None:
+        return _active
+
+    from storage import BACKENDS, StorageBackend
+
+    instrumentation = Instrumentation(profile)
+    for backend in [StorageBackend] + [cls for cls, _ in BACKENDS.values()]:
+        instrumentation.instrument(backend, lambda backend: backend.bytes_written)
+    for cls in classes:
+        instrumentation.instrument(cls)
+    if path is not None:
+        atexit.register(instrumentation.dump, path)
+    if profile is not None:
+        atexit.register(instrumentation.dump_profile)
+    _active = instrumentation
+    return instrumentation
+
+
+def disable() -> Instrumentation | None:
+    """Undo :func:`enable` without dumping anything; returns what was active."""
+
+    global _active
+    instrumentation, _active = _active, None
+    if instrumentation is not None:
+        instrumentation.uninstall()
+        atexit.unregister(instrumentation.dump)
+        atexit.unregister(instrumentation.dump_profile)
+    return instrumentation
+
+
+def configure(
+    stats: str | None = None, profile: str | None = None, classes: Iterable[type] = ()
+) -> Instrumentation | None:
+    """Enable instrumentation if asked to by arguments or the environment.
+
+    Arguments take precedence over :data:`STATS_ENV` and :data:`PROFILE_ENV`.
+    Returns the active :class:`Instrumentation`, or ``None`` when disabled.
+    """
+
+    stats = stats or os.environ.get(STATS_ENV) or None
+    profile = profile or os.environ.get(PROFILE_ENV) or None
+    if stats is None and profile is None:
+        return None
+    return enable(stats, profile, classes)
@@ -0,0 +1,237 @@
+"""Search over course names: prefix, substring, case and diacritic insensitive.
+
+Names are *folded* before indexing and matching: case-folded and stripped
+of diacritics, so "wyklad" finds "Wykład" and "LOGIKA" finds "Logika".
+"""
+
+import bisect
+import unicodedata
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from course import Course
+from storage import CourseKey
+
+# Below this many courses to add at once, insort them one by one.
+BULK_THRESHOLD = 64
+
+
+def _fold_table() -> Dict[int, str]:
+    """Map accented Latin letters to their base letters, for str.translate."""
+
+    table = {}
+    for code in range(0xC0, 0x250):
+        decomposed = unicodedata.normalize("NFKD", chr(code))
+        base = "".join(char for char in decomposed if not unicodedata.combining(char))
+        if base and base != chr(code):
+            table[code] = base.casefold()
+    # Letters with a stroke have no decomposition.
+    for letter, base in ("łl", "đd", "øo", "ħh", "ıi"):
+        table[ord(letter)] = base
+    return table
+
+
+FOLD_TABLE = _fold_table()
+
+
+def fold(text: str) -> str:
+    """Case-fold ``text`` and strip diacritics: ``fold("Wykład") == "wyklad"``."""
+
+    folded = text.casefold().translate(FOLD_TABLE)
+    if folded.isascii():
+        return folded
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", folded)
+        if not unicodedata.combining(char)
+    )
+
+
+def ngrams(text: str) -> set:
+    """All distinct substrings of ``text`` of one to three characters."""
+
+    return {
+        text[start:stop]
+        for start in range(len(text))
+        for stop in range(start + 1, min(start + 3, len(text)) + 1)
+    }
+
+
+class SearchIndex:
+    """Course keys indexed by folded name, maintained incrementally.
+
+    Every distinct course name gets an id, listing the formats it is
+    offered in. Substring queries take the posting list of the query's
+    rarest 1-3 character n-gram (an ``array('I')`` of name ids) and check
+    only those names. Prefix queries bisect a sorted list of ``(folded
+    name, id)`` pairs. Ids are handed out in name order when the index is
+    built, so matches come out sorted by sorting integers; names added
+    later are sorted by name. A removed name only clears its id; the index
+    is rebuilt once removed ids outnumber live ones.
+    """
+
+    def __init__(self, keys: Iterable[CourseKey] = ()) -> None:
+        self._reset()
+        self.add_many(keys)
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}  # name -> id
+        self._names: List[Optional[str]] = []  # id -> name
+        self._folded: List[Optional[str]] = []  # id -> folded name
+        self._formats: List[List[str]] = []  # id -> sorted formats
+        self._sorted: List[Tuple[str, int]] = []
+        self._postings: Dict[str, array] = {}
+        self._ordered = 0  # ids below this were handed out in name order
+        self._removed = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _register(self, name: str) -> int:
+        name_id = len(self._names)
+        folded = fold(name)
+        self._ids[name] = name_id
+        self._names.append(name)
+        self._folded.append(folded)
+        self._formats.append([])
+        postings = self._postings
+        for gram in ngrams(folded):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("I")
+            posting.append(name_id)
+        return name_id
+
+    def add(self, key: CourseKey) -> None:
+        name, format = key
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = self._register(name)
+            bisect.insort(self._sorted, (self._folded[name_id], name_id))
+        formats = self._formats[name_id]
+        position = bisect.bisect_left(formats, format)
+        if position == len(formats) or formats[position] != format:
+            formats.insert(position, format)
+            self._size += 1
+
+    def add_many(self, keys: Iterable[CourseKey]) -> None:
+        keys = list(keys)
+        if len(keys) < BULK_THRESHOLD:
+            for key in keys:
+                self.add(key)
+        else:
+            # Rebuild, so that every name gets an id in name order again.
+            self._build(keys + list(self.keys()))
+
+    def _build(self, keys: List[CourseKey]) -> None:
+        self._reset()
+        keys.sort()
+        formats = self._formats
+        for name, format in keys:
+            name_id = self._ids.get(name)
+            if name_id is None:
+                name_id = self._register(name)
+            if not formats[name_id] or formats[name_id][-1] != format:
+                formats[name_id].append(format)
+                self._size += 1
+        self._sorted = sorted(zip(self._folded, range(len(self._folded))))
+        self._ordered = len(self._names)
+
+    def remove(self, key: CourseKey) -> None:
+        name, format = key
+        name_id = self._ids.get(name)
+        if name_id is None or format not in self._formats[name_id]:
+            return
+        self._formats[name_id].remove(format)
+        self._size -= 1
+        if self._formats[name_id]:
+            return
+        del self._ids[name]
+        folded = self._folded[name_id]
+        del self._sorted[bisect.bisect_left(self._sorted, (folded, name_id))]
+        self._names[name_id] = self._folded[name_id] = None
+        self._removed += 1
+        if self._removed > max(len(self._ids), 1024):
+            self._build(list(self.keys()))
+
+    def keys(self) -> Iterator[CourseKey]:
+        for name_id, name in enumerate(self._names):
+            if name is not None:
+                for format in self._formats[name_id]:
+                    yield name, format
+
+    def _match(self, query: str, prefix: bool) -> List[int]:
+        if prefix:
+            entries = self._sorted
+            position = bisect.bisect_left(entries, (query,))
+            stop = bisect.bisect_left(entries, (query + "\U0010ffff",), position)
+            return [name_id for _, name_id in entries[position:stop]]
+        size = min(3, len(query))
+        postings = [
+            self._postings.get(gram) for gram in ngrams(query) if len(gram) == size
+        ]
+        if None in postings:
+            return []
+        candidates = min(postings, key=len)
+        folded = self._folded
+        if len(query) == size:
+            # The posting of the query itself: every live name matches.
+            return [name_id for name_id in candidates if folded[name_id] is not None]
+        return [
+            name_id
+            for name_id in candidates
+            if folded[name_id] is not None and query in folded[name_id]
+        ]
+
+    def search(
+        self, query: str, prefix: bool = False, format: str | None = None
+    ) -> List[CourseKey]:
+        """Return the keys of courses whose name matches ``query``, sorted.
+
+        ``prefix`` matches the start of the name only; otherwise ``query``
+        may occur anywhere in it. ``format`` keeps only that format.
+        """
+
+        query = fold(query)
+        if query:
+            name_ids = self._match(query, prefix)
+        else:
+            name_ids = [i for i, name in enumerate(self._names) if name is not None]
+        name_ids.sort()
+        if name_ids and name_ids[-1] >= self._ordered:
+            name_ids.sort(key=self._names.__getitem__)
+
+        names, formats = self._names, self._formats
+        if format is not None:
+            return [(names[i], format) for i in name_ids if format in formats[i]]
+        return [(names[i], each) for i in name_ids for each in formats[i]]
+
+
+class CourseListing:
+    """A sorted list of courses with the positional API of ``CourseTracker``.
+
+    Lets the GUI show search results exactly like the full listing.
+    """
+
+    def __init__(self, courses: List[Course]) -> None:
+        self.courses = courses
+        self._keys = [(course.name, course.format) for course in courses]
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def list_courses(self) -> List[Course]:
+        return list(self.courses)
+
+    def course_at(self, position: int) -> Course:
+        return self.courses[position]
+
+    def course_slice(self, start: int, stop: int) -> List[Course]:
+        return self.courses[start:stop]
+
+    def course_position(self, name: str, format: str) -> int:
+        position = bisect.bisect_left(self._keys, (name, format))
+        if position == len(self._keys) or self._keys[position] != (name, format):
+            raise ValueError("Ten kurs nie istnieje")
+        return position
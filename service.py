@@ -0,0 +1,451 @@
+"""Local HTTP/JSON service sharing one course database between clients.
+
+Run ``python service.py [--port 8765]`` and talk JSON over HTTP/1.1:
+
+==========  ==============================  ==================================
+``GET``     ``/courses?offset=0&limit=100``  one page of courses, sorted
+``POST``    ``/courses``                     add ``{"name", "format"[, "un_classes"]}``
+``GET``     ``/courses/NAME/FORMAT``         one course
+``DELETE``  ``/courses/NAME/FORMAT``         remove a course
+``POST``    ``/courses/NAME/FORMAT/inc``     record an unattended class
+``POST``    ``/courses/NAME/FORMAT/dec``     take one back
+``POST``    ``/batch``                       ``{"operations": [{"op": ...}, ...]}``
+==========  ==============================  ==================================
+
+All writes go through a single writer task. It applies whatever operations
+are queued, persists them with one backend write and then publishes a new
+read-only :class:`Snapshot`, so reads never wait for disk and always see
+committed data. Connections are kept alive between requests.
+"""
+
+import asyncio
+import json
+import sys
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from course_tracker import CourseTracker
+from storage import CourseKey
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 8 * 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# (command, name, format, un_classes)
+Operation = Tuple[str, str, str, int]
+Row = Tuple[str, str, int]
+
+
+class ServiceError(Exception):
+    """A request that cannot be served, with the HTTP status to answer."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class Snapshot:
+    """An immutable, sorted copy of all courses at one committed version."""
+
+    def __init__(self, version: int, rows: List[Row], keys: List[CourseKey]) -> None:
+        self.version = version
+        self.rows = rows
+        self.keys = keys  # (name, format) of each row, for bisecting
+
+    @classmethod
+    def of(cls, tracker: CourseTracker, version: int) -> "Snapshot":
+        rows = [
+            (course.name, course.format, course.un_classes)
+            for course in tracker.courses
+        ]
+        return cls(version, rows, [(row[0], row[1]) for row in rows])
+
+    def updated(
+        self, tracker: CourseTracker, keys: Iterable[CourseKey], version: int
+    ) -> "Snapshot":
+        """A copy with the rows of ``keys`` brought up to date with ``tracker``.
+
+        Only the changed rows are looked up, so a commit costs a copy of the
+        row list rather than a rebuild of every row.
+        """
+
+        rows, row_keys = self.rows.copy(), self.keys.copy()
+        for key in keys:
+            position = bisect_left(row_keys, key)
+            found = position < len(row_keys) and row_keys[position] == key
+            if key in tracker:
+                course = tracker.get_course(*key)
+                row = (course.name, course.format, course.un_classes)
+                if found:
+                    rows[position] = row
+                else:
+                    rows.insert(position, row)
+                    row_keys.insert(position, key)
+            elif found:
+                del rows[position], row_keys[position]
+        return Snapshot(version, rows, row_keys)
+
+    def position(self, key: CourseKey) -> Optional[int]:
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+
+def course_json(row: Row) -> dict:
+    return {"name": row[0], "format": row[1], "un_classes": row[2]}
+
+
+def parse_operation(data) -> Operation:
+    """Validate one JSON operation of a ``/batch`` request."""
+
+    if not isinstance(data, dict):
+        raise ServiceError(400, "operation must be an object")
+    command = data.get("op")
+    if command not in ("add", "remove", "inc", "dec"):
+        raise ServiceError(400, f"unknown operation: {command!r}")
+    name, format = data.get("name"), data.get("format")
+    if not isinstance(name, str) or not name:
+        raise ServiceError(400, "missing course name")
+    if not isinstance(format, str) or not format:
+        raise ServiceError(400, "missing course format")
+    un_classes = data.get("un_classes", 0)
+    if not isinstance(un_classes, int) or isinstance(un_classes, bool):
+        raise ServiceError(400, "un_classes must be an integer")
+    return command, name, format, un_classes
+
+
+class TrackerService:
+    """Serve a :class:`CourseTracker` to concurrent HTTP clients.
+
+    The tracker is only touched by the writer task; its backend only by a
+    single writer thread, so one store connection is shared by everyone.
+    Each round of queued units is applied in one tracker transaction.
+    """
+
+    def __init__(self, tracker: CourseTracker) -> None:
+        self.tracker = tracker
+        self.snapshot = Snapshot.of(tracker, 0)
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="course-store")
+        self.requests = 0
+        self.commits = 0
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        if self.tracker.write_queue is not None:
+            self.tracker.write_queue.close()
+            self.tracker.write_queue = None
+        self.tracker.enable_write_behind(debounce=None)
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        return await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_SIZE
+        )
+
+    async def stop(self) -> None:
+        if self._writer is not None:
+            await self._writes.join()
+            self._writer.cancel()
+            self._writer = None
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.tracker.close
+        )
+        self._executor.shutdown()
+
+    # Writes
+
+    async def submit(self, operations: List[Operation]) -> List[Optional[dict]]:
+        """Queue ``operations`` as one all-or-nothing unit and wait for commit.
+
+        Returns the resulting course for every operation (``None`` for
+        removals).
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operations, future))
+        return await future
+
+    async def _write_loop(self) -> None:
+        while True:
+            pending = [await self._writes.get()]
+            while not self._writes.empty():
+                pending.append(self._writes.get_nowait())
+            try:
+                committed = await self._commit(pending)
+                if committed:
+                    self.commits += 1
+                    keys = {
+                        (name, format)
+                        for units, _ in pending
+                        for _, name, format, _ in units
+                    }
+                    self.snapshot = self.snapshot.updated(
+                        self.tracker, keys, self.snapshot.version + 1
+                    )
+                for future, results in committed:
+                    if not future.done():
+                        future.set_result(results)
+            except Exception as e:
+                print(f"Error applying writes: {e}", file=sys.stderr)
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in pending:
+                    self._writes.task_done()
+
+    async def _commit(self, pending: list) -> list:
+        """Apply the valid units of ``pending`` and commit them in one write.
+
+        Returns ``(future, results)`` for each applied unit. If the write
+        fails, the tracker is rolled back and the error raised, so nothing
+        uncommitted is ever published.
+        """
+
+        transaction = self.tracker.transaction()
+        transaction.__enter__()
+        try:
+            committed = []
+            for operations, future in pending:
+                try:
+                    self._check(operations)
+                except ServiceError as e:
+                    future.set_exception(e)
+                    continue
+                committed.append((future, [self._apply(op) for op in operations]))
+        except BaseException:
+            transaction.__exit__(*sys.exc_info())
+            raise
+        # The commit writes to the store, so it runs on the store thread.
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, transaction.__exit__, None, None, None
+        )
+        return committed
+
+    def _check(self, operations: List[Operation]) -> None:
+        """Reject the unit unless every operation in it will succeed."""
+
+        exists: Dict[CourseKey, bool] = {}
+        for command, name, format, _ in operations:
+            key = (name, format)
+            present = exists.get(key, key in self.tracker)
+            if command == "add":
+                if present:
+                    raise ServiceError(409, f"Ten kurs juz istnieje: {name}, {format}")
+                exists[key] = True
+            elif not present:
+                raise ServiceError(404, f"Ten kurs nie istnieje: {name}, {format}")
+            elif command == "remove":
+                exists[key] = False
+
+    def _apply(self, operation: Operation) -> Optional[dict]:
+        command, name, format, un_classes = operation
+        tracker = self.tracker
+        if command == "add":
+            tracker.add_course(name, format, un_classes)
+        elif command == "remove":
+            tracker.remove_course(name, format)
+            return None
+        elif command == "inc":
+            tracker.increment_unattended(name, format)
+        else:
+            tracker.decrement_unattended(name, format)
+        course = tracker.get_course(name, format)
+        return course_json((course.name, course.format, course.un_classes))
+
+    # Reads
+
+    def list_page(self, query: Dict[str, List[str]]) -> dict:
+        snapshot = self.snapshot
+        try:
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+        except ValueError:
+            raise ServiceError(400, "offset and limit must be integers") from None
+        if offset < 0 or limit < 0:
+            raise ServiceError(400, "offset and limit must not be negative")
+        limit = min(limit, MAX_PAGE_SIZE)
+        return {
+            "version": snapshot.version,
+            "total": len(snapshot.rows),
+            "offset": offset,
+            "limit": limit,
+            "courses": list(map(course_json, snapshot.rows[offset : offset + limit])),
+        }
+
+    def get(self, key: CourseKey) -> dict:
+        snapshot = self.snapshot
+        position = snapshot.position(key)
+        if position is None:
+            raise ServiceError(404, "Ten kurs nie istnieje")
+        return course_json(snapshot.rows[position])
+
+    # HTTP
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, dict]:
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        if parts[0] == "courses" and len(parts) == 1:
+            if method == "GET":
+                return 200, self.list_page(parse_qs(url.query))
+            if method == "POST":
+                data = self._json(body)
+                operation = parse_operation(dict(data, op="add"))
+                return 201, (await self.submit([operation]))[0]
+        elif parts[0] == "courses" and len(parts) == 3:
+            key = (parts[1], parts[2])
+            if method == "GET":
+                return 200, self.get(key)
+            if method == "DELETE":
+                await self.submit([("remove", *key, 0)])
+                return 200, {"removed": {"name": key[0], "format": key[1]}}
+        elif parts[0] == "courses" and len(parts) == 4 and parts[3] in ("inc", "dec"):
+            if method == "POST":
+                return 200, (await self.submit([(parts[3], *parts[1:3], 0)]))[0]
+        elif parts == ["batch"]:
+            if method == "POST":
+                data = self._json(body)
+                if not isinstance(data, dict) or not isinstance(
+                    data.get("operations"), list
+                ):
+                    raise ServiceError(400, "expected {\"operations\": [...]}")
+                operations = [parse_operation(item) for item in data["operations"]]
+                results = await self.submit(operations)
+                return 200, {"applied": len(results), "results": results}
+        else:
+            raise ServiceError(404, "no such resource")
+        raise ServiceError(405, f"method {method} not allowed")
+
+    @staticmethod
+    def _json(body: bytes):
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise ServiceError(400, "request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise ServiceError(400, "request body must be a JSON object")
+        return data
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection
+                except asyncio.LimitOverrunError:
+                    writer.write(response(431, {"error": "headers too large"}, False))
+                    break
+                keep_alive = False
+                try:
+                    request_line, *lines = head.decode("latin-1").split("\r\n")
+                    method, target, version = request_line.split(" ", 2)
+                    headers = {}
+                    for line in lines:
+                        field, _, value = line.partition(":")
+                        headers[field.strip().lower()] = value.strip().lower()
+                    connection = headers.get("connection", "")
+                    keep_alive = (
+                        connection == "keep-alive"
+                        if version == "HTTP/1.0"
+                        else connection != "close"
+                    )
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise ServiceError(413, "request body too large")
+                    body = await reader.readexactly(length) if length > 0 else b""
+                    status, payload = await self.dispatch(method, target, body)
+                except ServiceError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError:
+                    keep_alive = False
+                    status, payload = 400, {"error": "malformed request"}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    print(f"Error handling request: {e}", file=sys.stderr)
+                    status, payload = 500, {"error": "internal error"}
+                self.requests += 1
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def serve(tracker: CourseTracker, host: str, port: int) -> None:
+    service = TrackerService(tracker)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(tracker)} courses on http://{address[0]}:{address[1]}")
+    sys.stdout.flush()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv: List[str] | None = None) -> int:
+    import argparse
+
+    from storage import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Serve the course database over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db-directory", help="directory holding the database")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="tinydb")
+    args = parser.parse_args(argv)
+
+    try:
+        tracker = CourseTracker(db_directory=args.db_directory, backend=args.backend)
+    except OSError as e:
+        print(f"service: {e}", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(serve(tracker, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tracker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,674 @@
+"""Storage backends persisting course records.
+
+A backend stores ``(name, format, un_classes)`` records keyed by
+``(name, format)``. Every write method commits exactly once, so the tracker
+decides how many changes end up in a single write. Writes may also carry
+attendance events, ``((name, format), delta, timestamp)``, which backends
+that only keep current state ignore.
+
+Backends import their database modules when they are opened, so importing
+this module stays cheap on startup.
+
+The JSON and SQLite backends may be shared by several processes. A write
+never drops records another process stored in the meantime, and attendance
+changes are applied on top of the stored counts rather than overwriting
+them. :meth:`StorageBackend.refresh` reports what other processes changed.
+
+Backends count the bytes they write to their files in ``bytes_written``;
+SQLite writes its files itself and leaves it at zero.
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from course import Course
+from file_lock import FileLock
+
+CourseKey = Tuple[str, str]
+CourseRecord = Tuple[str, str, int]
+AttendanceEvent = Tuple[CourseKey, int, float]
+
+
+def group_deltas(events: Iterable[AttendanceEvent]) -> Dict[CourseKey, List[int]]:
+    """Collect the attendance deltas of ``events`` per course, in order."""
+
+    deltas: Dict[CourseKey, List[int]] = {}
+    for key, delta, _ in events:
+        deltas.setdefault(key, []).append(delta)
+    return deltas
+
+
+def apply_deltas(un_classes: int, deltas: Iterable[int]) -> int:
+    """Replay attendance changes on a stored count, clamping like ``Course``."""
+
+    for delta in deltas:
+        un_classes = max(0, min(un_classes + delta, 3))
+    return un_classes
+
+
+class StorageBackend(ABC):
+    """Interface the :class:`~course_tracker.CourseTracker` persists through."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.bytes_written = 0
+
+    @abstractmethod
+    def load(self) -> Iterator[CourseRecord]:
+        """Yield every stored record in insertion order."""
+
+    @abstractmethod
+    def write(
+        self,
+        upserts: Iterable[Course] = (),
+        deletes: Iterable[CourseKey] = (),
+        events: Iterable[AttendanceEvent] = (),
+    ) -> None:
+        """Insert or update ``upserts`` and remove ``deletes`` in one commit.
+
+        ``events`` are the attendance changes that led to the new state, in
+        the order they happened. Deletes are applied first, so a course in
+        both was removed and added again: its stored record and the deltas
+        recorded before the removal are dropped, and it is stored anew.
+        """
+
+    def insert(self, courses: Iterable[Course]) -> None:
+        """Store courses that are known not to exist yet, in one commit."""
+
+        self.write(upserts=courses)
+
+    @abstractmethod
+    def replace(self, courses: Iterable[Course]) -> None:
+        """Replace all stored records with ``courses`` in one commit."""
+
+    def clear(self) -> None:
+        self.replace(())
+
+    def refresh(self) -> Optional[Iterator[CourseRecord]]:
+        """Return all records if the store changed behind our back, else ``None``.
+
+        "Behind our back" covers writes by other processes and writes of
+        this backend whose result differs from the records it was given.
+        """
+
+        return None
+
+    def events(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[dict]:
+        """Yield recorded events with a timestamp in ``[start, end)``."""
+
+        raise NotImplementedError(
+            f"{type(self).__name__} does not keep an event history"
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class AtomicJSONStorage:
+    """TinyDB storage that replaces the JSON file atomically.
+
+    Each write goes to a temporary file in the same directory, which is
+    synced and then renamed over the database. Readers, and a restart after
+    a crash, only ever see a complete document.
+    """
+
+    def __init__(self, path: str) -> None:
+        import json
+
+        self.path = path
+        self._json = json
+
+    def read(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        return self._json.loads(data) if data else None
+
+    def write(self, data: dict) -> None:
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self._json.dumps(data))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self.path)
+
+    def close(self) -> None:
+        pass
+
+
+class TinyDBBackend(StorageBackend):
+    """The JSON document used since the first release, through TinyDB.
+
+    TinyDB rewrites the whole JSON document on every write, so writes are
+    buffered by a ``CachingMiddleware`` and flushed once per backend call.
+    Document ids are remembered per course key so updates touch only the
+    affected documents.
+
+    Writes hold the :class:`FileLock` ``<path>.lock`` and first reread the
+    document if another process replaced it since it was last read, as told
+    by the lock's version number or the file's mtime.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.lock = FileLock(path + ".lock")
+        self._doc_ids: Dict[CourseKey, int] = {}
+        self._version: tuple | None = None  # of the document we hold
+        self._stale = False
+        self._open()
+
+    def _open(self) -> None:
+        from tinydb import TinyDB
+        from tinydb.middlewares import CachingMiddleware
+
+        self.db = TinyDB(self.path, storage=CachingMiddleware(AtomicJSONStorage))
+        self.db.storage.WRITE_CACHE_SIZE = float("inf")
+
+    def _current_version(self) -> tuple:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self.lock.read_version(), None
+        return self.lock.read_version(), stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> List[CourseRecord]:
+        """Reread the document from disk. Call with the lock held."""
+
+        self.db.close()
+        self._open()
+        self._doc_ids = {}
+        records = []
+        for document in self.db.all():
+            self._doc_ids[(document["name"], document["format"])] = document.doc_id
+            records.append(
+                (document["name"], document["format"], document["un_classes"])
+            )
+        self._version = self._current_version()
+        return records
+
+    def _sync(self) -> None:
+        """Pick up the document if another process changed it. Lock held."""
+
+        if self._current_version() != self._version:
+            self._read()
+            self._stale = True
+
+    def _commit(self) -> None:
+        self.db.storage.flush()
+        self.lock.bump_version()
+        self._version = self._current_version()
+        self.bytes_written += os.path.getsize(self.path)  # the whole document
+
+    @staticmethod
+    def _record(course: Course, un_classes: int | None = None) -> dict:
+        return {
+            "name": course.name,
+            "format": course.format,
+            "un_classes": course.un_classes if un_classes is None else un_classes,
+        }
+
+    def load(self) -> Iterator[CourseRecord]:
+        with self.lock:
+            self._stale = False
+            return iter(self._read())
+
+    def refresh(self) -> Optional[Iterator[CourseRecord]]:
+        if not self._stale and self._current_version() == self._version:
+            return None
+        return self.load()
+
+    def write(
+        self,
+        upserts: Iterable[Course] = (),
+        deletes: Iterable[CourseKey] = (),
+        events: Iterable[AttendanceEvent] = (),
+    ) -> None:
+        deltas = group_deltas(events)
+        with self.lock:
+            self._sync()
+            removed = [
+                self._doc_ids.pop(key) for key in deletes if key in self._doc_ids
+            ]
+            if removed:
+                self.db.remove(doc_ids=removed)
+
+            changed: Dict[CourseKey, dict] = {}
+            new = []
+            for course in upserts:
+                key = (course.name, course.format)
+                doc_id = self._doc_ids.get(key)
+                if doc_id is None:
+                    new.append(course)
+                elif key in deltas:
+                    stored = self.db.get(doc_id=doc_id)["un_classes"]
+                    un_classes = apply_deltas(stored, deltas[key])
+                    self._stale |= un_classes != course.un_classes
+                    changed[key] = self._record(course, un_classes)
+                else:
+                    changed[key] = self._record(course)
+            if changed:
+                self.db.update(
+                    lambda document: document.update(
+                        changed[(document["name"], document["format"])]
+                    ),
+                    doc_ids=[self._doc_ids[key] for key in changed],
+                )
+            self._insert(new)
+            if removed or changed or new:
+                self._commit()
+
+    def _insert(self, courses: Iterable[Course]) -> None:
+        courses = list(courses)
+        if not courses:
+            return
+        doc_ids = self.db.insert_multiple(self._record(course) for course in courses)
+        for course, doc_id in zip(courses, doc_ids):
+            self._doc_ids[(course.name, course.format)] = doc_id
+
+    def replace(self, courses: Iterable[Course]) -> None:
+        """Replace the document, discarding what other processes stored."""
+
+        with self.lock:
+            self.db.truncate()
+            self._doc_ids = {}
+            self._insert(courses)
+            self._commit()
+            self._stale = False
+
+    def close(self) -> None:
+        self.db.close()
+        self.lock.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Courses in an SQLite table with a unique index on ``(name, format)``.
+
+    The database runs in WAL mode and every write is a single transaction of
+    parameterised statements, which :mod:`sqlite3` prepares once and caches.
+    Unlike the JSON file, a write costs proportionally to the records it
+    touches, not to the size of the catalogue. SQLite locks the database
+    across processes itself; ``PRAGMA data_version`` tells whether another
+    connection committed since the records were last loaded.
+    """
+
+    UPSERT = (
+        "INSERT INTO courses (name, format, un_classes) VALUES (?, ?, ?) "
+        "ON CONFLICT (name, format) DO UPDATE SET un_classes = excluded.un_classes"
+    )
+    INSERT = (
+        "INSERT INTO courses (name, format, un_classes) VALUES (?, ?, ?) "
+        "ON CONFLICT (name, format) DO NOTHING"
+    )
+    DELETE = "DELETE FROM courses WHERE name = ? AND format = ?"
+    SELECT = "SELECT un_classes FROM courses WHERE name = ? AND format = ?"
+
+    def __init__(self, path: str) -> None:
+        import sqlite3
+        import threading
+
+        super().__init__(path)
+        # The connection is shared by the loader, writer and GUI threads;
+        # the lock keeps their transactions apart.
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._data_version: int | None = None
+        self._stale = False
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS courses ("
+                "id INTEGER PRIMARY KEY, "
+                "name TEXT NOT NULL, "
+                "format TEXT NOT NULL, "
+                "un_classes INTEGER NOT NULL DEFAULT 0)"
+            )
+            self.connection.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS courses_key "
+                "ON courses (name, format)"
+            )
+
+    @staticmethod
+    def _rows(courses: Iterable[Course]) -> Iterator[CourseRecord]:
+        return ((course.name, course.format, course.un_classes) for course in courses)
+
+    def _current_version(self) -> int:
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> Iterator[CourseRecord]:
+        with self._lock:
+            self._stale = False
+            self._data_version = self._current_version()
+            return iter(
+                self.connection.execute(
+                    "SELECT name, format, un_classes FROM courses ORDER BY id"
+                ).fetchall()
+            )
+
+    def refresh(self) -> Optional[Iterator[CourseRecord]]:
+        with self._lock:
+            if not self._stale and self._current_version() == self._data_version:
+                return None
+            return self.load()
+
+    def write(
+        self,
+        upserts: Iterable[Course] = (),
+        deletes: Iterable[CourseKey] = (),
+        events: Iterable[AttendanceEvent] = (),
+    ) -> None:
+        deltas = group_deltas(events)
+        with self._lock, self.connection:
+            if deltas:
+                # Take the write lock before reading the counts to update.
+                self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany(self.DELETE, deletes)
+            rows = []
+            for course in upserts:
+                key = (course.name, course.format)
+                un_classes = course.un_classes
+                if key in deltas:
+                    stored = self.connection.execute(self.SELECT, key).fetchone()
+                    if stored is not None:
+                        un_classes = apply_deltas(stored[0], deltas[key])
+                        self._stale |= un_classes != course.un_classes
+                rows.append((course.name, course.format, un_classes))
+            self.connection.executemany(self.UPSERT, rows)
+
+    def insert(self, courses: Iterable[Course]) -> None:
+        with self._lock, self.connection:
+            self.connection.executemany(self.INSERT, self._rows(courses))
+
+    def replace(self, courses: Iterable[Course]) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM courses")
+            self.connection.executemany(self.UPSERT, self._rows(courses))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class EventLogBackend(StorageBackend):
+    """An append-only log of course events with periodic snapshots.
+
+    Every write appends one JSON line per event to ``path``: ``set`` and
+    ``remove`` for course records and ``delta`` for each attendance change,
+    each with a sequence number and a timestamp. A write costs only the
+    lines it appends.
+
+    After ``snapshot_every`` events the current state is saved to
+    ``<path>.snapshot`` and the active log is moved to ``<path>.history``,
+    so loading replays at most that many events on top of the snapshot. The
+    history keeps every event for :meth:`events` queries. Sequence numbers
+    are assigned in memory, so only one process may write a log at a time:
+    the backend holds the :class:`FileLock` ``<path>.lock`` while it is
+    open, and opening a log another process holds raises ``OSError``.
+    """
+
+    SNAPSHOT_EVERY = 10_000
+
+    def __init__(self, path: str, snapshot_every: int = SNAPSHOT_EVERY) -> None:
+        import json
+
+        super().__init__(path)
+        self.snapshot_path = path + ".snapshot"
+        self.history_path = path + ".history"
+        self.snapshot_every = snapshot_every
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+        self._decode = json.loads
+        self.state: Dict[CourseKey, int] = {}
+        self.seq = 0
+        self.since_snapshot = 0
+        self._loaded = False
+        self.lock = FileLock(path + ".lock")
+        if not self.lock.hold():
+            self.lock.close()
+            raise OSError(f"{path} is already open in another process")
+        self._drop_torn_line(path)
+        self._log = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _drop_torn_line(path: str) -> None:
+        """Cut a line torn by a crash mid-append off the end of ``path``.
+
+        Appending after it would glue the next event onto the torn line and
+        lose both on replay.
+        """
+
+        if not os.path.exists(path):
+            return
+        with open(path, "r+b") as handle:
+            end = handle.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 65536)
+                handle.seek(start)
+                chunk = handle.read(position - start)
+                if position == end and chunk.endswith(b"\n"):
+                    return
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    handle.truncate(start + newline + 1)
+                    return
+                position = start
+            handle.truncate(0)
+
+    def _read_events(self, path: str) -> Iterator[dict]:
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield self._decode(line)
+                except ValueError:
+                    continue  # A line torn by a crash mid-append.
+
+    @staticmethod
+    def _apply(state: Dict[CourseKey, int], event: dict) -> None:
+        key = (event["name"], event["format"])
+        if event["op"] == "set":
+            state[key] = event["un_classes"]
+        elif event["op"] == "delta":
+            state[key] = max(0, min(state.get(key, 0) + event["delta"], 3))
+        elif event["op"] == "remove":
+            state.pop(key, None)
+
+    def _replay(self) -> None:
+        state: Dict[CourseKey, int] = {}
+        seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as handle:
+                snapshot = self._decode(handle.read())
+            state = {(name, format): un for name, format, un in snapshot["courses"]}
+            seq = snapshot["seq"]
+
+        replayed = 0
+        for event in self._read_events(self.path):
+            if event["seq"] > seq:
+                self._apply(state, event)
+                seq = event["seq"]
+                replayed += 1
+        self.state, self.seq, self.since_snapshot = state, seq, replayed
+        self._loaded = True
+
+    def load(self) -> Iterator[CourseRecord]:
+        self._replay()
+        return iter(
+            [(name, format, un) for (name, format), un in self.state.items()]
+        )
+
+    def _event(self, op: str, key: CourseKey, timestamp: float, **fields) -> str:
+        self.seq += 1
+        event = {"seq": self.seq, "t": timestamp, "op": op}
+        event.update(name=key[0], format=key[1], **fields)
+        self._apply(self.state, event)
+        return self._encode(event)
+
+    def write(
+        self,
+        upserts: Iterable[Course] = (),
+        deletes: Iterable[CourseKey] = (),
+        events: Iterable[AttendanceEvent] = (),
+    ) -> None:
+        if not self._loaded:
+            self._replay()
+        now = time.time()
+        lines = [
+            self._event("delta", key, timestamp, delta=delta)
+            for key, delta, timestamp in events
+        ]
+        for key in deletes:
+            if key in self.state:
+                lines.append(self._event("remove", key, now))
+        for course in upserts:
+            key = (course.name, course.format)
+            if self.state.get(key) != course.un_classes:
+                lines.append(self._event("set", key, now, un_classes=course.un_classes))
+        if not lines:
+            return
+
+        data = "\n".join(lines) + "\n"
+        self._log.write(data)
+        self._log.flush()
+        self.bytes_written += len(data.encode("utf-8"))
+        self.since_snapshot += len(lines)
+        if self.since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def replace(self, courses: Iterable[Course]) -> None:
+        if not self._loaded:
+            self._replay()
+        self.state = {
+            (course.name, course.format): course.un_classes for course in courses
+        }
+        self.compact()
+
+    def _last_seq(self, path: str) -> int:
+        """Sequence number of the last event in ``path``, reading only its tail."""
+
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as handle:
+            handle.seek(max(0, handle.seek(0, os.SEEK_END) - 65536))
+            lines = handle.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return self._decode(line)["seq"]
+            except ValueError:
+                continue
+        return 0
+
+    def compact(self) -> None:
+        """Snapshot the current state and move the active log to the history.
+
+        Each step is safe to interrupt: events already copied to the history
+        are not copied twice, and replay skips events the snapshot covers.
+        """
+
+        self._log.flush()
+        history_seq = self._last_seq(self.history_path)
+        self._drop_torn_line(self.history_path)
+        with open(self.history_path, "a", encoding="utf-8") as history:
+            for event in self._read_events(self.path):
+                if event["seq"] > history_seq:
+                    line = self._encode(event) + "\n"
+                    history.write(line)
+                    self.bytes_written += len(line.encode("utf-8"))
+
+        snapshot = {
+            "seq": self.seq,
+            "courses": [
+                [name, format, un] for (name, format), un in self.state.items()
+            ],
+        }
+        temporary = self.snapshot_path + ".tmp"
+        data = self._encode(snapshot).encode("utf-8")
+        with open(temporary, "wb") as handle:
+            handle.write(data)
+        os.replace(temporary, self.snapshot_path)
+        self.bytes_written += len(data)
+
+        self._log.close()
+        self._log = open(self.path, "w", encoding="utf-8")
+        self.since_snapshot = 0
+
+    def events(
+        self, start: float | None = None, end: float | None = None
+    ) -> Iterator[dict]:
+        self._log.flush()
+        last = 0
+        for path in (self.history_path, self.path):
+            for event in self._read_events(path):
+                if event["seq"] <= last:
+                    continue  # Left in both files by an interrupted compaction.
+                last = event["seq"]
+                if start is not None and event["t"] < start:
+                    continue
+                if end is not None and event["t"] >= end:
+                    continue
+                yield event
+
+    def close(self) -> None:
+        self._log.close()
+        self.lock.close()
+
+
+BACKENDS = {
+    "tinydb": (TinyDBBackend, "course_database.json"),
+    "sqlite": (SQLiteBackend, "course_database.sqlite3"),
+    "eventlog": (EventLogBackend, "course_events.jsonl"),
+}
+
+
+def open_backend(path: str) -> StorageBackend:
+    """Open a backend for ``path``, chosen by its extension."""
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".sqlite", ".sqlite3", ".db"):
+        return SQLiteBackend(path)
+    if extension == ".jsonl":
+        return EventLogBackend(path)
+    return TinyDBBackend(path)
+
+
+def migrate(source: StorageBackend, target: StorageBackend) -> int:
+    """Copy every record from ``source`` to ``target``, replacing its contents.
+
+    Returns the number of migrated courses.
+    """
+
+    courses = [Course(*record) for record in source.load()]
+    target.replace(courses)
+    return len(courses)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Migrate a course database between storage backends."
+    )
+    parser.add_argument("source", help="existing database (.json, .sqlite3, .jsonl)")
+    parser.add_argument("target", help="database to create or overwrite")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"File {args.source} does not exist.")
+    source = open_backend(args.source)
+    target = open_backend(args.target)
+    try:
+        count = migrate(source, target)
+    finally:
+        source.close()
+        target.close()
+    print(f"Migrated {count} courses from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import inspect
+
+import pytest
+
+
+@pytest.fixture
+def record_writes(monkeypatch):
+    """Return a function that starts recording a tracker's backend writes.
+
+    ``record_writes(tracker)`` wraps ``tracker.backend.write`` and returns
+    the list that every later call is appended to, as a dict of its
+    arguments by name.
+    """
+
+    def record(tracker):
+        writes = []
+        write = tracker.backend.write
+        signature = inspect.signature(write)
+
+        def recording_write(*args, **kwargs):
+            writes.append(dict(signature.bind(*args, **kwargs).arguments))
+            return write(*args, **kwargs)
+
+        monkeypatch.setattr(tracker.backend, "write", recording_write)
+        return writes
+
+    return record
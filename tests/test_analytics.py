@@ -0,0 +1,96 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import analytics
+from analytics import CourseColumns
+from course import Course
+from course_store import CourseStore
+from course_tracker import CourseTracker
+
+COURSES = [
+    Course("Algebra", "Wykład", 0),
+    Course("Algebra", "Audytorium", 2),
+    Course("Fizyka", "Laboratorium", 3),
+    Course("Fizyka", "Wykład", 1),
+    Course("Chemia", "Seminarium", 2),
+]
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(analytics, "np", None)
+    return request.param
+
+
+def test_statistics(backend):
+    columns = CourseColumns.from_courses(COURSES)
+    assert analytics.histogram(columns) == [1, 1, 2, 1]
+    assert analytics.tag_counts(columns) == {
+        "green": 1,
+        "yellow": 1,
+        "orange": 2,
+        "red": 1,
+    }
+    assert analytics.format_histograms(columns) == {
+        "Audytorium": [0, 0, 1, 0],
+        "Wykład": [1, 1, 0, 0],
+        "Laboratorium": [0, 0, 0, 1],
+        "Seminarium": [0, 0, 1, 0],
+    }
+    assert analytics.format_totals(columns)["Wykład"] == {
+        "courses": 2,
+        "unattended": 1,
+    }
+    assert analytics.at_risk(columns) == [
+        ("Algebra", "Audytorium", 2),
+        ("Fizyka", "Laboratorium", 3),
+        ("Chemia", "Seminarium", 2),
+    ]
+    assert analytics.at_risk(columns, threshold=3) == [("Fizyka", "Laboratorium", 3)]
+
+
+def test_many_formats(backend):
+    courses = [Course(f"Kurs {i}", f"Format {i}", i % 4) for i in range(300)]
+    columns = CourseColumns.from_courses(courses)
+    histograms = analytics.format_histograms(columns)
+    assert len(histograms) == 3 + 300
+    assert histograms["Format 299"] == [0, 0, 0, 1]
+    assert analytics.at_risk(columns, threshold=3)[-1] == ("Kurs 299", "Format 299", 3)
+
+
+def test_store_columns_match(backend):
+    store = CourseStore(COURSES)
+    assert analytics.summarize(CourseColumns.from_store(store)) == analytics.summarize(
+        CourseColumns.from_courses(COURSES)
+    )
+
+
+def test_tracker_summary_and_cli(tmp_path):
+    tracker = CourseTracker(db_directory=str(tmp_path))
+    tracker.courses = COURSES
+    tracker.save_courses()
+    summary = tracker.attendance_summary()
+    tracker.close()
+    assert summary["courses"] == 5
+    assert summary["histogram"] == [1, 1, 2, 1]
+    # Sorted tracker order.
+    assert summary["at_risk"][0] == ("Algebra", "Audytorium", 2)
+
+    output = subprocess.run(
+        [sys.executable, "analytics.py", "--db-directory", str(tmp_path), "--json"],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        check=True,
+        text=True,
+        encoding="utf-8",
+    ).stdout
+    summary["at_risk"] = [list(course) for course in summary["at_risk"]]
+    assert json.loads(output) == summary
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+
+
+def write(path, rows):
+    path.write_text(
+        "Nazwa,Format,Opuszczone\n" + "".join(f"{row}\n" for row in rows),
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def files(tmp_path):
+    first = write(tmp_path / "a.csv", ["Algebra,Wykład,1", "Fizyka,Wykład,2", "zła,x"])
+    second = write(tmp_path / "b.csv", ["Algebra,Wykład,2", "Chemia,Laboratorium,0"])
+    return [first, second, tmp_path / "missing.csv"]
+
+
+def courses(tracker):
+    return {(c.name, c.format): c.un_classes for c in tracker.list_courses()}
+
+
+@pytest.mark.parametrize(
+    "conflict, algebra, fizyka",
+    [("skip", 0, 2), ("overwrite", 2, 2), ("sum", 3, 2)],
+)
+def test_conflict_policies(
+    tmp_path, record_writes, files, conflict, algebra, fizyka
+):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład")
+    writes = record_writes(tracker)
+
+    reports = tracker.import_courses_bulk(files, conflict=conflict, workers=2)
+
+    assert len(writes) == 1
+    assert courses(tracker) == {
+        ("Algebra", "Wykład"): algebra,
+        ("Chemia", "Laboratorium"): 0,
+        ("Fizyka", "Wykład"): fizyka,
+    }
+    first, second, missing = reports
+    assert (first.rows, len(first.errors), first.errors[0].line) == (3, 1, 4)
+    assert second.rows == 2
+    assert second.skipped == (1 if conflict == "skip" else 0)
+    assert not missing.ok and missing.rows == 1
+    assert courses(CourseTracker(db_directory=tmp_path)) == courses(tracker)
+
+
+def test_replace_and_unknown_policy(tmp_path, files):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Logika", "Wykład")
+    tracker.import_courses_bulk(files[:2], replace=True, workers=1)
+    assert sorted(courses(CourseTracker(db_directory=tmp_path))) == [
+        ("Algebra", "Wykład"),
+        ("Chemia", "Laboratorium"),
+        ("Fizyka", "Wykład"),
+    ]
+    with pytest.raises(ValueError):
+        tracker.import_courses_bulk(files, conflict="max")
+
+
+def test_replace_keeps_courses_when_nothing_is_read(tmp_path, files):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Logika", "Wykład")
+    bad = write(tmp_path / "bad.csv", ["Algebra;Wykład;1"])
+    reports = tracker.import_courses_bulk([bad, files[2]], replace=True, workers=1)
+    assert [report.imported for report in reports] == [0, 0]
+    assert courses(tracker) == {("Logika", "Wykład"): 0}
+    assert courses(CourseTracker(db_directory=tmp_path)) == courses(tracker)
@@ -0,0 +1,87 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker, apply_batch
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_cli(directory, *args, input=None):
+    return subprocess.run(
+        [sys.executable, "-m", "course_tracker", "--db-directory", str(directory)]
+        + list(args),
+        cwd=ROOT,
+        input=input,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+
+
+def test_cli_commands(tmp_path):
+    assert run_cli(tmp_path, "add", "Algebra", "Wykład").returncode == 0
+    assert run_cli(tmp_path, "inc", "Algebra", "Wykład").stdout == "1\n"
+    result = run_cli(tmp_path, "add", "Algebra", "Wykład")
+    assert result.returncode == 1
+    assert "Ten kurs juz istnieje" in result.stderr
+
+    batch = "add 'Fizyka kwantowa' Laboratorium 2\n# comment\n\ndec Algebra Wykład\n"
+    assert run_cli(tmp_path, "batch", input=batch).stdout == "Applied 2 operations\n"
+    assert run_cli(tmp_path, "list").stdout == (
+        "Algebra\tWykład\t0\nFizyka kwantowa\tLaboratorium\t2\n"
+    )
+
+
+def test_cli_does_not_import_gui_modules(tmp_path):
+    code = (
+        "import runpy, sys\n"
+        f"sys.argv = ['course_tracker', '--db-directory', {str(tmp_path)!r}, 'list']\n"
+        "try:\n"
+        "    runpy.run_module('course_tracker', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted({'tkinter', 'darkdetect'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_batch_is_one_write_and_rolls_back(tmp_path, record_writes):
+    tracker = CourseTracker(db_directory=tmp_path)
+    writes = record_writes(tracker)
+
+    lines = ["add Algebra Wykład", "inc Algebra Wykład", "add Fizyka Audytorium 1"]
+    assert apply_batch(tracker, lines) == 3
+    assert len(writes) == 1
+
+    with pytest.raises(ValueError, match="line 2"):
+        apply_batch(tracker, ["remove Algebra Wykład", "inc Chemia Wykład"])
+    assert len(writes) == 1
+    assert [c.name for c in tracker.list_courses()] == ["Algebra", "Fizyka"]
+    assert tracker.write_queue is None
+    tracker.close()
+
+
+def test_batch_remove_and_add_again_starts_from_zero(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path, backend="sqlite")
+    tracker.add_course("Algebra", "Wykład", un_classes=2)
+    lines = ["inc Algebra Wykład", "remove Algebra Wykład", "add Algebra Wykład"]
+    assert apply_batch(tracker, lines) == 3
+    tracker.close()
+    reloaded = CourseTracker(db_directory=tmp_path, backend="sqlite")
+    assert reloaded.get_course("Algebra", "Wykład").un_classes == 0
+    reloaded.close()
+
+
+def test_locked_event_log_is_reported(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path, backend="eventlog")
+    result = run_cli(tmp_path, "--backend", "eventlog", "list")
+    tracker.close()
+    assert result.returncode == 1
+    assert result.stderr.startswith("course_tracker list: ")
@@ -0,0 +1,87 @@
+import json
+import multiprocessing
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+
+PROCESSES = 3
+SHARED = 15
+OWN = 15
+
+
+def worker(directory: str, backend: str, number: int, start) -> None:
+    rng = random.Random(number)
+    tracker = CourseTracker(db_directory=directory, backend=backend)
+    start.wait()  # All processes have loaded the same counts.
+    shared = [f"Wspólny {i:02d}" for i in range(SHARED)]
+    rng.shuffle(shared)
+    for i, name in enumerate(shared):
+        # Every process increments every shared course once, from whatever
+        # count it last saw; none of the increments may get lost.
+        tracker.increment_unattended(name, "Wykład")
+        tracker.add_course(f"Proces {number} kurs {i:02d}", "Laboratorium", 1)
+        if i % 5 == 0:
+            tracker.refresh()
+    tracker.close()
+
+
+@pytest.mark.parametrize("backend", ["tinydb", "sqlite"])
+def test_processes_do_not_clobber_each_other(tmp_path, backend):
+    tracker = CourseTracker(db_directory=tmp_path, backend=backend)
+    for i in range(SHARED):
+        tracker.add_course(f"Wspólny {i:02d}", "Wykład")
+
+    start = multiprocessing.Barrier(PROCESSES)
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(str(tmp_path), backend, number, start)
+        )
+        for number in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    # The first tracker never reloaded; refresh brings in the other writes.
+    changed = tracker.refresh()
+    assert len(changed) == SHARED + PROCESSES * OWN
+    courses = tracker.list_courses()
+    assert len(courses) == SHARED + PROCESSES * OWN
+    assert all(
+        course.un_classes == (PROCESSES if course.format == "Wykład" else 1)
+        for course in courses
+    )
+    assert tracker.refresh() == []
+    tracker.close()
+
+    if backend == "tinydb":
+        with open(tmp_path / "course_database.json", encoding="utf-8") as handle:
+            assert len(json.load(handle)["_default"]) == len(courses)
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_stale_tracker_keeps_external_changes(tmp_path):
+    first = CourseTracker(db_directory=tmp_path)
+    first.add_course("Algebra", "Wykład")
+    second = CourseTracker(db_directory=tmp_path)
+    second.add_course("Fizyka", "Audytorium")
+    second.increment_unattended("Algebra", "Wykład")
+
+    # ``first`` still thinks Algebra has 0 and knows nothing about Fizyka.
+    first.increment_unattended("Algebra", "Wykład")
+    first.add_course("Chemia", "Laboratorium")
+    assert sorted(first.refresh()) == [("Algebra", "Wykład"), ("Fizyka", "Audytorium")]
+    assert first.get_course("Algebra", "Wykład").un_classes == 2
+
+    second.remove_course("Fizyka", "Audytorium")
+    assert first.refresh() == [("Fizyka", "Audytorium")]
+    assert [c.name for c in first.list_courses()] == ["Algebra", "Chemia"]
+    first.close()
+    second.close()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import Course
+from course_store import CourseStore
+
+
+def test_course_has_no_instance_dict():
+    course = Course("Algebra", "Wykład", un_classes=7)
+    assert not hasattr(course, "__dict__")
+    assert course.un_classes == 3
+    course.un_classes = -1
+    assert course.un_classes == 0
+
+
+def test_store_views_behave_like_courses():
+    store = CourseStore([Course("Algebra", "Wykład", 2)])
+    view = store.append("Fizyka", "Laboratorium", un_classes=9)
+    assert len(store) == 2
+    assert view.un_classes == 3
+    assert str(store[0]) == str(Course("Algebra", "Wykład", 2))
+    assert store[0] == Course("Algebra", "Wykład")
+
+    store[0].increment_un_classes(5)
+    assert store[0].un_classes == 3
+    view.decrement_un_classes(2)
+    assert store.un_classes.tolist() == [3, 1]
+    with pytest.raises(ValueError):
+        view.increment_un_classes(-1)
+
+    del store[0]
+    assert [c.name for c in store] == ["Fizyka"]
+    with pytest.raises(IndexError):
+        store[1]
@@ -0,0 +1,102 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import Course
+from course_tracker import CourseTracker
+from storage import EventLogBackend
+
+
+def courses(tracker):
+    return [(c.name, c.format, c.un_classes) for c in tracker.list_courses()]
+
+
+def test_replay_rebuilds_state(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path, backend="eventlog")
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Laboratorium", un_classes=1)
+    for _ in range(5):
+        tracker.increment_unattended("Algebra", "Wykład")
+    tracker.decrement_unattended("Fizyka", "Laboratorium")
+    tracker.remove_course("Fizyka", "Laboratorium")
+    tracker.close()
+
+    log = (tmp_path / "course_events.jsonl").read_text(encoding="utf-8")
+    # Increments past the maximum of 3 change nothing and are not logged.
+    assert len(log.splitlines()) == 7
+
+    reloaded = CourseTracker(db_directory=tmp_path, backend="eventlog")
+    assert courses(reloaded) == [("Algebra", "Wykład", 3)]
+    reloaded.close()
+
+
+def test_compaction_keeps_state_and_history(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    backend = EventLogBackend(path, snapshot_every=4)
+    list(backend.load())
+    algebra = Course("Algebra", "Wykład")
+    backend.write(upserts=[algebra])
+    for timestamp in (100.0, 200.0, 300.0):
+        algebra.increment_un_classes()
+        event = (("Algebra", "Wykład"), 1, timestamp)
+        backend.write(upserts=[algebra], events=[event])
+    backend.write(upserts=[Course("Fizyka", "Wykład", 2)])
+    backend.close()
+
+    # Appending a torn line must not break replay.
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write('{"seq": 99, "op": "se')
+
+    backend = EventLogBackend(path, snapshot_every=4)
+    assert list(backend.load()) == [("Algebra", "Wykład", 3), ("Fizyka", "Wykład", 2)]
+    assert backend.since_snapshot == 1
+    times = [event["t"] for event in backend.events(150.0, 300.0)]
+    assert times == [200.0]
+    # ... and the next write must not be glued onto it.
+    backend.write(deletes=[("Fizyka", "Wykład")])
+    backend.close()
+
+    backend = EventLogBackend(path, snapshot_every=4)
+    assert list(backend.load()) == [("Algebra", "Wykład", 3)]
+    backend.close()
+
+
+def test_absences_by_time_range(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path, backend="eventlog")
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Wykład")
+    start = time.time()
+    tracker.increment_unattended("Algebra", "Wykład")
+    tracker.increment_unattended("Fizyka", "Wykład")
+    tracker.decrement_unattended("Fizyka", "Wykład")
+
+    absences = tracker.absences(start=start)
+    assert [(name, format) for name, format, _ in absences] == [
+        ("Algebra", "Wykład"),
+        ("Fizyka", "Wykład"),
+    ]
+    assert tracker.absences(name="Fizyka", end=start) == []
+    tracker.close()
+
+
+def test_presses_at_the_limit_are_not_absences(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path, backend="eventlog")
+    tracker.add_course("Algebra", "Wykład", un_classes=2)
+    tracker.add_course("Fizyka", "Wykład", un_classes=2)
+    for _ in range(3):
+        tracker.increment_unattended("Algebra", "Wykład")
+    tracker.apply_deltas({("Fizyka", "Wykład"): 3})
+    assert [name for name, _, _ in tracker.absences()] == ["Algebra", "Fizyka"]
+    tracker.close()
+
+
+def test_only_one_writer_may_open_the_log(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    backend = EventLogBackend(path)
+    with pytest.raises(OSError):
+        EventLogBackend(path)
+    backend.close()
+    EventLogBackend(path).close()
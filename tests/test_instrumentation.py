@@ -0,0 +1,50 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import instrumentation
+from course_tracker import CourseTracker
+from storage import TinyDBBackend
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv(instrumentation.STATS_ENV, raising=False)
+    monkeypatch.delenv(instrumentation.PROFILE_ENV, raising=False)
+    original = CourseTracker.add_course
+    assert instrumentation.configure(classes=[CourseTracker]) is None
+    assert CourseTracker.add_course is original
+
+
+def test_records_operations_and_bytes(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(instrumentation.STATS_ENV, str(tmp_path / "stats.json"))
+    monkeypatch.setenv(instrumentation.PROFILE_ENV, "CourseTracker.search")
+    original = CourseTracker.add_course
+    active = instrumentation.configure(classes=[CourseTracker])
+    try:
+        tracker = CourseTracker(db_directory=tmp_path / "db")
+        for name in ("Algebra", "Fizyka", "Logika"):
+            tracker.add_course(name, "Wykład")
+        tracker.increment_unattended("Algebra", "Wykład")
+        tracker.search("log")
+        tracker.close()
+        active.dump(str(tmp_path / "stats.json"))
+        active.dump_profile()
+    finally:
+        instrumentation.disable()
+    assert CourseTracker.add_course is original
+
+    stats = json.loads((tmp_path / "stats.json").read_text())["operations"]
+    added = stats["CourseTracker.add_course"]
+    assert added["count"] == 3
+    assert sum(added["histogram_ms"].values()) == 3
+    assert "bytes_written" not in added
+    writes = stats["TinyDBBackend.write"]
+    assert writes["count"] == 4
+    database = tmp_path / "db" / "course_database.json"
+    assert writes["bytes_written"] >= 4 * database.stat().st_size // 2
+    assert not hasattr(TinyDBBackend.write, "__wrapped__")
+
+    assert (tmp_path / "CourseTracker.search.prof").exists()
+    assert "search_index.py" in capsys.readouterr().err
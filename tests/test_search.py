@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from search_index import SearchIndex, fold
+
+
+def names(courses):
+    return [(course.name, course.format) for course in courses]
+
+
+def test_fold_strips_case_and_diacritics():
+    assert fold("Wykład") == "wyklad"
+    assert fold("ŻÓŁĆ gęślą") == "zolc gesla"
+    assert fold("Straße") == "strasse"
+
+
+def test_search_prefix_substring_and_filters(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra liniowa", "Wykład")
+    tracker.add_course("Algebra liniowa", "Audytorium")
+    tracker.add_course("Analiza matematyczna", "Wykład")
+    tracker.add_course("Równania różniczkowe", "Laboratorium")
+    for _ in range(2):
+        tracker.increment_unattended("Algebra liniowa", "Wykład")
+
+    assert names(tracker.search("al", prefix=True)) == [
+        ("Algebra liniowa", "Audytorium"),
+        ("Algebra liniowa", "Wykład"),
+    ]
+    assert names(tracker.search("LIN")) == names(tracker.search("al", prefix=True))
+    assert names(tracker.search("rozn")) == [
+        ("Równania różniczkowe", "Laboratorium")
+    ]
+    assert names(tracker.search("a", format="Wykład")) == [
+        ("Algebra liniowa", "Wykład"),
+        ("Analiza matematyczna", "Wykład"),
+    ]
+    assert names(tracker.search("algebra", min_un_classes=1)) == [
+        ("Algebra liniowa", "Wykład")
+    ]
+    assert len(tracker.search(limit=3)) == 3
+    assert tracker.search("xyz") == []
+
+    # The index follows later additions and removals.
+    tracker.add_course("Algorytmy", "Wykład")
+    tracker.remove_course("Algebra liniowa", "Wykład")
+    assert names(tracker.search("alg", format="Wykład")) == [("Algorytmy", "Wykład")]
+
+
+def test_index_keeps_results_sorted_across_updates():
+    keys = [(f"Kurs {i:04d}", format) for i in range(200) for format in "AB"]
+    index = SearchIndex(keys)
+    index.add(("Kurs 0000a", "A"))
+    index.add(("Kurs", "B"))
+    index.remove(("Kurs 0001", "A"))
+    index.remove(("Kurs 0001", "B"))
+    expected = sorted(set(keys + [("Kurs 0000a", "A"), ("Kurs", "B")]))
+    expected = [key for key in expected if key[0] != "Kurs 0001"]
+    assert index.search("kurs") == expected
+    assert index.search("0000") == [
+        ("Kurs 0000", "A"),
+        ("Kurs 0000", "B"),
+        ("Kurs 0000a", "A"),
+    ]
+    assert index.search("kurs 00", prefix=True, format="B")[:2] == [
+        ("Kurs 0000", "B"),
+        ("Kurs 0002", "B"),
+    ]
+    assert len(index) == len(expected)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from service import TrackerService
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return int(head.split(b" ")[1]), json.loads(await reader.readexactly(length))
+
+
+def test_service_round_trip(tmp_path):
+    async def scenario():
+        service = TrackerService(CourseTracker(db_directory=tmp_path))
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        course = {"name": "Algebra", "format": "Wykład"}
+        assert await request(reader, writer, "POST", "/courses", course) == (
+            201,
+            dict(course, un_classes=0),
+        )
+        status, _ = await request(reader, writer, "POST", "/courses", course)
+        assert status == 409
+        status, _ = await request(reader, writer, "POST", "/courses", [course])
+        assert status == 400
+
+        # Concurrent increments are serialised by the writer task.
+        path = "/courses/Algebra/Wyk%C5%82ad/inc"
+        connections = [
+            await asyncio.open_connection("127.0.0.1", port) for _ in range(3)
+        ]
+        await asyncio.gather(*(request(*c, "POST", path) for c in connections))
+        for _, other in connections:
+            other.close()
+
+        # A failing batch is rejected as a whole.
+        operations = [
+            {"op": "add", "name": "Fizyka", "format": "Audytorium"},
+            {"op": "dec", "name": "Chemia", "format": "Wykład"},
+        ]
+        status, _ = await request(
+            reader, writer, "POST", "/batch", {"operations": operations}
+        )
+        assert status == 404
+        status, page = await request(reader, writer, "GET", "/courses?limit=1")
+        assert status == 200
+        assert page["total"] == 1
+        assert page["courses"] == [dict(course, un_classes=3)]
+
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+
+    asyncio.run(scenario())
+    tracker = CourseTracker(db_directory=tmp_path)
+    assert tracker.get_course("Algebra", "Wykład").un_classes == 3
+    assert len(tracker) == 1
+
+
+def test_failed_write_is_not_published(tmp_path):
+    async def scenario():
+        tracker = CourseTracker(db_directory=tmp_path)
+        service = TrackerService(tracker)
+        await service.start("127.0.0.1", 0)
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        tracker.backend.write = fail
+        with pytest.raises(OSError):
+            await service.submit([("add", "Algebra", "Wykład", 0)])
+        assert service.snapshot.rows == []
+        assert len(tracker) == 0
+        await service.stop()
+
+    asyncio.run(scenario())
+    assert len(CourseTracker(db_directory=tmp_path)) == 0
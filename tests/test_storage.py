@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course import Course
+from course_tracker import CourseTracker
+from storage import BACKENDS, SQLiteBackend, TinyDBBackend, migrate
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_tracker_round_trip(tmp_path, backend):
+    tracker = CourseTracker(db_directory=tmp_path, backend=backend)
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Laboratorium", un_classes=2)
+    tracker.add_course("Chemia", "Audytorium")
+    tracker.increment_unattended("Algebra", "Wykład")
+    tracker.remove_course("Chemia", "Audytorium")
+    tracker.close()
+
+    reloaded = CourseTracker(db_directory=tmp_path, backend=backend)
+    courses = [(c.name, c.format, c.un_classes) for c in reloaded.list_courses()]
+    assert courses == [("Algebra", "Wykład", 1), ("Fizyka", "Laboratorium", 2)]
+    reloaded.close()
+
+
+@pytest.mark.parametrize("backend_class", [TinyDBBackend, SQLiteBackend])
+def test_backend_write_is_keyed(tmp_path, backend_class):
+    backend = backend_class(str(tmp_path / "db"))
+    backend.insert([Course("Algebra", "Wykład"), Course("Algebra", "Audytorium")])
+    backend.write(
+        upserts=[Course("Algebra", "Wykład", 3), Course("Fizyka", "Wykład")],
+        deletes=[("Algebra", "Audytorium")],
+    )
+    assert list(backend.load()) == [("Algebra", "Wykład", 3), ("Fizyka", "Wykład", 0)]
+    backend.close()
+
+
+def test_migrate_between_backends(tmp_path):
+    source = TinyDBBackend(str(tmp_path / "courses.json"))
+    source.replace([Course("Algebra", "Wykład", 1), Course("Fizyka", "Wykład", 2)])
+    target = SQLiteBackend(str(tmp_path / "courses.sqlite3"))
+    target.insert([Course("Stary", "Wykład")])
+
+    assert migrate(source, target) == 2
+    assert list(target.load()) == list(source.load())
+    source.close()
+    target.close()
@@ -1,6 +1,11 @@
+import gzip
+import json
+import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from course_tracker import CourseTracker
 
@@ -29,3 +34,162 @@ def test_export_and_import(tmp_path):
     assert course.name == "Algebra"
     assert course.format == "Wykład"
     assert course.un_classes == 2
+
+
+def test_mutations_are_persisted(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Laboratorium", un_classes=1)
+    tracker.increment_unattended("Algebra", "Wykład")
+    tracker.decrement_unattended("Fizyka", "Laboratorium")
+    tracker.remove_course("Fizyka", "Laboratorium")
+
+    reloaded = CourseTracker(db_directory=tmp_path)
+    assert [(c.name, c.format, c.un_classes) for c in reloaded.list_courses()] == [
+        ("Algebra", "Wykład", 1)
+    ]
+
+
+def test_index_tracks_import_and_reset(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład", un_classes=1)
+    csv_file = tmp_path / "courses.csv"
+    csv_file.write_text(
+        "Nazwa,Format,Opuszczone\nAlgebra,Wykład,3\nAlgebra,Audytorium,2\n",
+        encoding="utf-8",
+    )
+
+    tracker.import_courses_append(csv_file)
+    assert tracker.get_course("Algebra", "Wykład").un_classes == 1
+    assert tracker.get_course("Algebra", "Audytorium").un_classes == 2
+    with pytest.raises(ValueError):
+        tracker.add_course("Algebra", "Audytorium")
+
+    tracker.reset_data()
+    with pytest.raises(ValueError):
+        tracker.get_course("Algebra", "Wykład")
+    tracker.add_course("Algebra", "Wykład")
+
+
+def test_list_courses_stays_sorted(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    for name, format in [
+        ("Fizyka", "Wykład"),
+        ("Algebra", "Wykład"),
+        ("Fizyka", "Audytorium"),
+        ("Chemia", "Laboratorium"),
+    ]:
+        tracker.add_course(name, format)
+    tracker.remove_course("Chemia", "Laboratorium")
+    tracker.add_course("Biologia", "Wykład")
+
+    keys = [(c.name, c.format) for c in tracker.list_courses()]
+    assert keys == sorted(keys)
+    assert len(keys) == 4
+
+
+def test_import_reports_bad_rows(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład", un_classes=1)
+    csv_file = tmp_path / "courses.csv"
+    csv_file.write_text(
+        "Nazwa,Format,Opuszczone\n"
+        "Fizyka,Wykład,1\n"
+        "Chemia,Wykład,dużo\n"
+        "Biologia\n"
+        "Algebra,Wykład,0\n"
+        "\n"
+        "Historia,Audytorium,2\n",
+        encoding="utf-8",
+    )
+
+    report = tracker.import_courses_append(csv_file, batch_size=2)
+    assert report.imported == 2
+    assert report.skipped == 1
+    assert [error.line for error in report.errors] == [3, 4]
+    assert not report.ok
+
+    reloaded = CourseTracker(db_directory=tmp_path)
+    names = [c.name for c in reloaded.list_courses()]
+    assert names == ["Algebra", "Fizyka", "Historia"]
+
+
+def test_export_jsonl_gzip_sorted(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Łacina", "Wykład", un_classes=1)
+    tracker.add_course("Algebra", "Audytorium", un_classes=3)
+    tracker.add_course("Fizyka", "Laboratorium")
+
+    out_file = tmp_path / "out.jsonl.gz"
+    tracker.export_courses(out_file, sort="un_classes")
+    with gzip.open(out_file, "rt", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle]
+    assert [record["name"] for record in records] == ["Fizyka", "Łacina", "Algebra"]
+    assert records[1] == {"name": "Łacina", "format": "Wykład", "un_classes": 1}
+
+    with pytest.raises(ValueError):
+        tracker.export_courses(tmp_path / "out.csv", sort="format")
+
+
+def test_export_to_stdout(tmp_path, capsys):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Fizyka", "Wykład")
+    tracker.add_course("Algebra", "Wykład", un_classes=2)
+    tracker.export_courses("-", sort="name")
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["Nazwa,Format,Opuszczone", "Algebra,Wykład,2", "Fizyka,Wykład,0"]
+
+
+def test_deferred_load(tmp_path):
+    CourseTracker(db_directory=tmp_path).add_course("Algebra", "Wykład")
+    tracker = CourseTracker(db_directory=tmp_path, load=False)
+    assert tracker.list_courses() == []
+    tracker.load_courses()
+    assert [c.name for c in tracker.list_courses()] == ["Algebra"]
+
+
+def test_startup_imports_are_lazy():
+    code = (
+        "import sys, course_tracker\n"
+        "lazy = {'tinydb', 'sqlite3', 'darkdetect', 'gzip', 'json', 'argparse'}\n"
+        "print(sorted(lazy & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_positional_access(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    for name in ["Fizyka", "Algebra", "Chemia"]:
+        tracker.add_course(name, "Wykład")
+
+    assert len(tracker) == 3
+    assert tracker.course_at(0).name == "Algebra"
+    assert [c.name for c in tracker.course_slice(1, 10)] == ["Chemia", "Fizyka"]
+    assert tracker.course_position("Fizyka", "Wykład") == 2
+    with pytest.raises(ValueError):
+        tracker.course_position("Fizyka", "Audytorium")
+
+
+def test_replace_import_without_courses_keeps_data(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład", un_classes=1)
+    tracker.add_course("Fizyka", "Laboratorium")
+    csv_file = tmp_path / "excel.csv"
+    csv_file.write_text(
+        "Nazwa;Format;Opuszczone\nLogika;Wykład;1\nChemia;Wykład;0\n",
+        encoding="utf-8",
+    )
+
+    report = tracker.import_courses_replace(csv_file)
+    assert (report.imported, len(report.errors)) == (0, 2)
+    expected = [("Algebra", "Wykład"), ("Fizyka", "Laboratorium")]
+    assert [(c.name, c.format) for c in tracker.list_courses()] == expected
+    reloaded = CourseTracker(db_directory=tmp_path)
+    assert [(c.name, c.format) for c in reloaded.list_courses()] == expected
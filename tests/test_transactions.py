@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+
+
+def courses(tracker):
+    return {(c.name, c.format): c.un_classes for c in tracker.list_courses()}
+
+
+@pytest.fixture
+def tracker(tmp_path, record_writes):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład", 2)
+    tracker.add_course("Fizyka", "Audytorium")
+    tracker.writes = record_writes(tracker)
+    yield tracker
+    tracker.close()
+
+
+def test_commit_is_one_write(tracker, tmp_path):
+    with tracker.transaction():
+        tracker.add_courses([("Chemia", "Wykład"), ("Logika", "Wykład", 3)])
+        tracker.remove_courses([("Fizyka", "Audytorium")])
+        tracker.apply_deltas({("Algebra", "Wykład"): 2, ("Logika", "Wykład"): -1})
+        tracker.increment_unattended("Chemia", "Wykład")
+        assert tracker.writes == []
+
+    assert len(tracker.writes) == 1
+    expected = {
+        ("Algebra", "Wykład"): 3,
+        ("Chemia", "Wykład"): 1,
+        ("Logika", "Wykład"): 2,
+    }
+    assert courses(tracker) == expected
+    assert courses(CourseTracker(db_directory=tmp_path)) == expected
+    assert tracker.write_queue is None
+
+
+def test_rollback_restores_memory_and_store(tracker, tmp_path):
+    before = courses(tracker)
+    with pytest.raises(RuntimeError):
+        with tracker.transaction():
+            tracker.add_courses([("Chemia", "Wykład")])
+            tracker.remove_course("Fizyka", "Audytorium")
+            tracker.apply_deltas([(("Algebra", "Wykład"), -5)])
+            tracker.reset_data()
+            tracker.add_course("Fizyka", "Audytorium", 7)
+            raise RuntimeError
+
+    assert courses(tracker) == before
+    assert [c.name for c in tracker.search("a")] == ["Algebra", "Fizyka"]
+    assert tracker.writes == []
+    assert courses(CourseTracker(db_directory=tmp_path)) == before
+
+
+def test_bulk_methods_validate_before_changing(tracker):
+    before = courses(tracker)
+    with pytest.raises(ValueError):
+        tracker.add_courses([("Chemia", "Wykład"), ("Algebra", "Wykład")])
+    with pytest.raises(ValueError):
+        tracker.add_courses([("Chemia", "Wykład"), ("Chemia", "Wykład")])
+    with pytest.raises(ValueError):
+        tracker.apply_deltas({("Algebra", "Wykład"): 1, ("Brak", "Wykład"): 1})
+    assert courses(tracker) == before
+    assert tracker.writes == []
+
+
+def test_deltas_clamp_and_nested_transactions_join(tracker):
+    with tracker.transaction():
+        with tracker.transaction():
+            tracker.apply_deltas({("Algebra", "Wykład"): -10})
+        tracker.decrement_unattended("Fizyka", "Audytorium")
+        assert tracker.writes == []
+    assert len(tracker.writes) == 1
+    assert courses(tracker) == {("Algebra", "Wykład"): 0, ("Fizyka", "Audytorium"): 0}
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+from view_cache import ViewCache
+
+
+def test_lru_bound_and_versions():
+    cache = ViewCache(maxsize=2)
+    assert cache.get("a", 1, lambda: "a1") == "a1"
+    assert cache.get("a", 1, lambda: "unused") == "a1"
+    assert cache.get("a", 2, lambda: "a2") == "a2"
+    cache.get("b", 1, lambda: "b1")
+    cache.get("a", 2, lambda: "unused")
+    cache.get("c", 1, lambda: "c1")  # evicts "b", the least recently used
+    assert cache.get("b", 1, lambda: "b1 again") == "b1 again"
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 5,
+        "evictions": 2,
+        "size": 2,
+        "maxsize": 2,
+    }
+
+
+def test_views_are_invalidated_precisely(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Laboratorium")
+    cache = tracker.view_cache
+
+    lectures = tracker.courses_by_format("Wykład")
+    assert [c.name for c in lectures] == ["Algebra"]
+    tracker.list_courses_str()
+    misses = cache.misses
+
+    # Attendance changes only invalidate the string renderings.
+    tracker.increment_unattended("Algebra", "Wykład")
+    assert tracker.courses_by_format("Wykład") == lectures
+    assert cache.misses == misses
+    assert "Unattended Classes: 1" in tracker.list_courses_str()[0]
+    assert cache.misses == misses + 1
+
+    # Adding a lab leaves the lecture view alone but not the full listing.
+    tracker.add_course("Chemia", "Laboratorium")
+    hits = cache.hits
+    tracker.courses_by_format("Wykład")
+    assert cache.hits == hits + 1
+    assert [c.name for c in tracker.list_courses()] == ["Algebra", "Chemia", "Fizyka"]
+    assert [c.name for c in tracker.courses_by_format("Laboratorium")] == [
+        "Chemia",
+        "Fizyka",
+    ]
+
+    # Callers get copies, so they cannot corrupt the cached views.
+    tracker.list_courses().clear()
+    assert len(tracker.list_courses()) == 3
+
+    tracker.reset_data()
+    assert tracker.courses_by_format("Wykład") == []
+    assert tracker.list_courses_str() == []
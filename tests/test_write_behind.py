@@ -0,0 +1,104 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from course_tracker import CourseTracker
+
+
+def stored(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    courses = [(c.name, c.format, c.un_classes) for c in tracker.list_courses()]
+    tracker.close()
+    return courses
+
+
+def test_coalesces_and_flushes_on_close(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.add_course("Algebra", "Wykład")
+    tracker.enable_write_behind(debounce=60)
+
+    for _ in range(5):
+        tracker.increment_unattended("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Wykład")
+    tracker.remove_course("Fizyka", "Wykład")
+    assert stored(tmp_path) == [("Algebra", "Wykład", 0)]
+
+    metrics = tracker.write_queue.metrics()
+    assert metrics["queued_updates"] == 7
+    assert metrics["coalesced_updates"] == 5
+    assert metrics["flush_count"] == 0
+
+    tracker.close()
+    assert stored(tmp_path) == [("Algebra", "Wykład", 3)]
+
+
+def test_flushes_when_batch_is_full(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.enable_write_behind(debounce=60, batch_size=2)
+    tracker.add_course("Algebra", "Wykład")
+    tracker.add_course("Fizyka", "Wykład")
+
+    deadline = time.monotonic() + 5
+    while tracker.write_queue.metrics()["flush_count"] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert len(stored(tmp_path)) == 2
+    tracker.close()
+
+
+def test_bulk_writes_keep_queued_order(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.enable_write_behind(debounce=60)
+    tracker.add_course("Algebra", "Wykład", un_classes=1)
+    tracker.reset_data()
+    tracker.close()
+    assert stored(tmp_path) == []
+
+
+def test_close_raises_and_keeps_changes_when_the_write_fails(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.enable_write_behind(debounce=60)
+    tracker.add_course("Algebra", "Wykład")
+    write = tracker.backend.write
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    tracker.backend.write = fail
+    with pytest.raises(OSError):
+        tracker.close()
+    assert tracker.write_queue.metrics()["pending"] == 1
+
+    tracker.backend.write = write
+    tracker.close()
+    assert stored(tmp_path) == [("Algebra", "Wykład", 0)]
+
+
+def test_idle_until_changes_are_queued(tmp_path):
+    tracker = CourseTracker(db_directory=tmp_path)
+    tracker.enable_write_behind(debounce=60)
+    assert tracker.write_queue.idle()
+    tracker.add_course("Algebra", "Wykład")
+    assert not tracker.write_queue.idle()
+    tracker.flush()
+    assert tracker.write_queue.idle()
+    tracker.close()
+
+
+@pytest.mark.parametrize("backend", ["tinydb", "sqlite", "eventlog"])
+def test_removed_and_added_again_drops_old_deltas(tmp_path, backend):
+    tracker = CourseTracker(db_directory=tmp_path, backend=backend)
+    tracker.add_course("Algebra", "Wykład", un_classes=2)
+    tracker.enable_write_behind(debounce=60)
+    tracker.increment_unattended("Algebra", "Wykład")
+    tracker.remove_course("Algebra", "Wykład")
+    tracker.add_course("Algebra", "Wykład")
+    tracker.increment_unattended("Algebra", "Wykład")
+    tracker.close()
+
+    reloaded = CourseTracker(db_directory=tmp_path, backend=backend)
+    assert [c.un_classes for c in reloaded.list_courses()] == [1]
+    reloaded.close()
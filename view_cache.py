@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+DEFAULT_VIEW_CACHE_SIZE = 32
+
+T = TypeVar("T")
+
+
+class ViewCache:
+    """A bounded LRU cache of views derived from the course collection.
+
+    Every entry remembers the data version it was built from. A lookup with
+    a different version is a miss and rebuilds the view, so owners never
+    delete entries; they bump the version a view depends on. Once more
+    than ``maxsize`` views are cached the least recently used one is
+    dropped.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_VIEW_CACHE_SIZE) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], T]) -> T:
+        """Return the view ``key`` at ``version``, calling ``build`` on a miss."""
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = build()
+        if self.maxsize:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,113 @@
+from tkinter import ttk
+
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+WHEEL_ROWS = 3
+
+
+class VirtualCourseList:
+    """Virtual scrolling for the courses Treeview.
+
+    Only the rows that fit in the widget exist as Treeview items. Scrolling
+    reuses those items for a different window of the tracker's sorted
+    listing, so memory and redraw cost do not depend on the catalogue size.
+    The selection is kept as a position in the listing. ``tracker`` may be
+    any listing with the tracker's positional API, such as search results.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, tracker, tag_for):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.tracker = tracker
+        self.tag_for = tag_for
+        self.top = 0
+        self.selected = None
+        self.pool = []
+
+        style_height = ttk.Style(tree).lookup("Treeview", "rowheight")
+        self.row_height = int(style_height or DEFAULT_ROW_HEIGHT)
+
+        tree.delete(*tree.get_children())
+        tree.configure(yscrollcommand="")
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", lambda event: self.render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(sequence, self.on_wheel)
+
+    def visible_rows(self) -> int:
+        return max(1, (self.tree.winfo_height() - HEADING_HEIGHT) // self.row_height)
+
+    def render(self) -> None:
+        total = len(self.tracker)
+        rows = self.visible_rows()
+        self.top = max(0, min(self.top, total - rows))
+        courses = self.tracker.course_slice(self.top, self.top + rows)
+
+        while len(self.pool) < len(courses):
+            self.pool.append(self.tree.insert("", "end"))
+        while len(self.pool) > len(courses):
+            self.tree.delete(self.pool.pop())
+        for item, course in zip(self.pool, courses):
+            self.tree.item(
+                item,
+                values=(course.name, course.format, course.un_classes),
+                tags=(self.tag_for(course.un_classes),),
+            )
+
+        self.show_selection()
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(courses)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def show_selection(self) -> None:
+        if self.selected is not None and 0 <= self.selected - self.top < len(self.pool):
+            item = self.pool[self.selected - self.top]
+            if self.tree.selection() != (item,):
+                self.tree.selection_set(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+    def refresh(self, select_key=None) -> None:
+        """Re-render after the listing changed, keeping ``select_key`` selected."""
+
+        self.selected = None
+        if select_key is not None:
+            try:
+                self.selected = self.tracker.course_position(*select_key)
+            except ValueError:
+                pass
+        self.render()
+
+    def yview(self, *args) -> None:
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.tracker))
+        elif args[0] == "scroll":
+            step = len(self.pool) if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.render()
+
+    def on_wheel(self, event) -> str:
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.yview("scroll", -WHEEL_ROWS if up else WHEEL_ROWS, "units")
+        return "break"
+
+    def select_index(self, index: int) -> None:
+        """Select the course at ``index`` and scroll it into view."""
+
+        self.selected = index
+        rows = self.visible_rows()
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + rows:
+            self.top = index - rows + 1
+        self.render()
+
+    def index_of_item(self, item) -> int:
+        return self.top + self.pool.index(item)
+
+    def selected_key(self):
+        if self.selected is None or self.selected >= len(self.tracker):
+            return None
+        course = self.tracker.course_at(self.selected)
+        return (course.name, course.format)
@@ -0,0 +1,212 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+from course import Course
+from storage import AttendanceEvent, CourseKey, StorageBackend
+
+DEFAULT_DEBOUNCE = 0.25
+DEFAULT_BATCH_SIZE = 500
+
+
+class WriteBehindQueue:
+    """Coalesce course writes and persist them from a background thread.
+
+    Changes are keyed by ``(name, format)``, so repeated edits of a course
+    collapse into one pending record holding its latest state. The writer
+    thread flushes everything pending in a single backend write once the
+    oldest pending change is ``debounce`` seconds old, or earlier when
+    ``batch_size`` courses are pending. :meth:`close` performs a final flush.
+    A failed write keeps the changes pending: the writer thread reports it
+    and retries after ``debounce``, while :meth:`flush` and :meth:`close`
+    raise the backend's error to their caller.
+    With ``debounce=None`` no writer thread is started and changes are only
+    persisted by explicit :meth:`flush` calls, which batch them all into
+    one write.
+    Attendance events are history rather than state, so they are kept in
+    order and never coalesced. A course removed and added again keeps its
+    pending delete, so the backend drops the old record and the deltas
+    recorded for it instead of replaying them onto the new one.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        debounce: float | None = DEFAULT_DEBOUNCE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.backend = backend
+        self.debounce = debounce
+        self.batch_size = batch_size
+
+        self._upserts: Dict[CourseKey, Course] = {}
+        self._deletes: Set[CourseKey] = set()
+        self._events: List[AttendanceEvent] = []
+        self._since: float | None = None  # when the oldest pending change came in
+        self._closed = False
+        self._changed = threading.Condition()
+        self._write_lock = threading.Lock()
+
+        self.queued_updates = 0
+        self.coalesced_updates = 0
+        self.flush_count = 0
+        self.flushed_records = 0
+        self.flush_errors = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+        self._thread: threading.Thread | None = None
+        if debounce is not None:
+            self._thread = threading.Thread(
+                target=self._run, name="course-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def upsert(self, course: Course, events: Iterable[AttendanceEvent] = ()) -> None:
+        key = (course.name, course.format)
+        with self._changed:
+            self._enqueue(key)
+            self._upserts[key] = course
+            self._events.extend(events)
+
+    def delete(self, key: CourseKey) -> None:
+        with self._changed:
+            self._enqueue(key)
+            self._upserts.pop(key, None)
+            self._deletes.add(key)
+
+    def _enqueue(self, key: CourseKey) -> None:
+        self.queued_updates += 1
+        if key in self._upserts or key in self._deletes:
+            self.coalesced_updates += 1
+        if self._since is None:
+            self._since = time.monotonic()
+        self._changed.notify()
+
+    def _pending(self) -> int:
+        return len(self._upserts) + len(self._deletes)
+
+    def _run(self) -> None:
+        with self._changed:
+            while True:
+                while not self._closed and self._since is None:
+                    self._changed.wait()
+                if self._closed:
+                    return
+                remaining = self._since + self.debounce - time.monotonic()
+                if remaining > 0 and self._pending() < self.batch_size:
+                    self._changed.wait(remaining)
+                    continue
+                self._changed.release()
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Error writing courses: {e}")
+                finally:
+                    self._changed.acquire()
+
+    def flush(self) -> None:
+        """Write all pending changes now, from the calling thread.
+
+        If the backend write fails, the changes are queued again and the
+        error is raised.
+        """
+
+        with self._write_lock:
+            with self._changed:
+                upserts, deletes, events = self._upserts, self._deletes, self._events
+                self._upserts, self._deletes, self._events = {}, set(), []
+                self._since = None
+            if not upserts and not deletes:
+                return
+
+            start = time.perf_counter()
+            try:
+                self.backend.write(list(upserts.values()), deletes, events)
+            except Exception:
+                self._requeue(upserts, deletes, events)
+                raise
+            elapsed = time.perf_counter() - start
+
+            with self._changed:
+                self.flush_count += 1
+                self.flushed_records += len(upserts) + len(deletes)
+                self.flush_seconds_total += elapsed
+                self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    def _requeue(
+        self,
+        upserts: Dict[CourseKey, Course],
+        deletes: Set[CourseKey],
+        events: List[AttendanceEvent],
+    ) -> None:
+        """Put back changes from a failed flush unless newer ones superseded them."""
+
+        with self._changed:
+            self.flush_errors += 1
+            self._events[:0] = events
+            for key, course in upserts.items():
+                if key not in self._upserts and key not in self._deletes:
+                    self._upserts[key] = course
+            # The store still holds what these deletes removed, so they go
+            # back even before newer upserts of the same courses.
+            self._deletes.update(deletes)
+            if self._since is None:
+                self._since = time.monotonic()
+
+    def idle(self) -> bool:
+        """Whether no change is waiting for or being written right now."""
+
+        with self._changed:
+            return not self._pending() and not self._write_lock.locked()
+
+    def take(self) -> Tuple[List[Course], Set[CourseKey], List[AttendanceEvent]]:
+        """Remove all pending changes and return them for the caller to write."""
+
+        with self._changed:
+            upserts, deletes, events = self._upserts, self._deletes, self._events
+            self._upserts, self._deletes, self._events = {}, set(), []
+            self._since = None
+            return list(upserts.values()), deletes, events
+
+    def discard(self) -> int:
+        """Drop all pending changes without writing them; return their count."""
+
+        with self._changed:
+            pending = self._pending()
+            self._upserts, self._deletes, self._events = {}, set(), []
+            self._since = None
+            return pending
+
+    def close(self) -> None:
+        """Stop the writer thread and flush what is pending.
+
+        Raises if the final flush fails; the changes stay pending, so calling
+        it again retries the write.
+        """
+
+        with self._changed:
+            stopping = not self._closed
+            self._closed = True
+            self._changed.notify()
+        if stopping and self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def metrics(self) -> dict:
+        with self._changed:
+            return {
+                "queued_updates": self.queued_updates,
+                "coalesced_updates": self.coalesced_updates,
+                "pending": self._pending(),
+                "flush_count": self.flush_count,
+                "flushed_records": self.flushed_records,
+                "flush_errors": self.flush_errors,
+                "flush_seconds_total": self.flush_seconds_total,
+                "flush_seconds_max": self.flush_seconds_max,
+                "flush_seconds_avg": (
+                    self.flush_seconds_total / self.flush_count
+                    if self.flush_count
+                    else 0.0
+                ),
+            }